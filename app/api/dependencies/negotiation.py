@@ -0,0 +1,83 @@
+from enum import Enum
+from typing import Dict, List, Tuple
+
+from fastapi import Header, HTTPException, Query
+from starlette.responses import Response
+
+from app.api.responses import formats
+from app.api.responses.formats import ARROW_STREAM_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from app.api.responses.serialization import JSON_MEDIA_TYPE
+from app.api.responses.streaming import NDJSON_MEDIA_TYPE
+
+
+class ResponseFormat(Enum):
+    json: str = JSON_MEDIA_TYPE
+    ndjson: str = NDJSON_MEDIA_TYPE
+    msgpack: str = MSGPACK_MEDIA_TYPE
+    arrow: str = ARROW_STREAM_MEDIA_TYPE
+
+
+# Optional package each binary format needs
+FORMAT_PACKAGES: Dict[ResponseFormat, str] = {
+    ResponseFormat.msgpack: "msgpack",
+    ResponseFormat.arrow: "pyarrow",
+}
+
+
+def is_available(response_format: ResponseFormat) -> bool:
+    package = FORMAT_PACKAGES.get(response_format)
+    return package is None or getattr(formats, package) is not None
+
+
+def parse_accept(accept: str) -> List[Tuple[str, float]]:
+    """Media ranges of an Accept header, highest quality first, ties in header order"""
+    ranges = []
+    for part in accept.split(","):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_type.lower(), quality))
+    return sorted(ranges, key=lambda item: -item[1])
+
+
+def negotiate(accept: str) -> ResponseFormat:
+    """Pick the response format of a list route, JSON unless the client prefers an available other format"""
+    unavailable = []
+    for media_type, quality in parse_accept(accept):
+        if quality <= 0:
+            continue
+        if media_type in ("*/*", "application/*"):
+            return ResponseFormat.json
+        try:
+            response_format = ResponseFormat(media_type)
+        except ValueError:
+            continue
+        if is_available(response_format):
+            return response_format
+        unavailable.append(response_format)
+    if unavailable:
+        packages = ", ".join(FORMAT_PACKAGES[response_format] for response_format in unavailable)
+        raise HTTPException(status_code=406, detail=f"The requested format needs an optional package not installed: {packages}")
+    return ResponseFormat.json
+
+
+# Dependency to pick the format of a list route, `stream=true` is a shortcut for NDJSON
+def get_response_format(
+    stream: bool = Query(False),
+    accept: str = Header(""),
+) -> ResponseFormat:
+    return ResponseFormat.ndjson if stream else negotiate(accept)
+
+
+def vary_on_accept(response: Response) -> Response:
+    """Mark a response of a list route as depending on the Accept header, for shared caches"""
+    response.headers.add_vary_header("Accept")
+    return response
@@ -0,0 +1,40 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Query
+
+
+def encode_cursor(id: int) -> str:
+    payload = json.dumps({"id": id}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return int(payload["id"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+@dataclass
+class PageParams:
+    """Keyset pagination parameters, ``after_id`` is decoded from the opaque cursor"""
+    limit: int
+    after_id: Optional[int] = None
+
+    def to_response(self, items: List[Any], has_more: bool) -> dict:
+        next_cursor = encode_cursor(items[-1].id) if has_more and items else None
+        return {"items": items, "next_cursor": next_cursor}
+
+
+# Dependency to get the pagination parameters of list routes
+def get_page_params(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+) -> PageParams:
+    after_id = decode_cursor(cursor) if cursor else None
+    return PageParams(limit=limit, after_id=after_id)
@@ -1,11 +1,13 @@
-from app.db_models.session import SessionLocal
+from app.db_models.session import AsyncReadSessionLocal, AsyncSessionLocal
 
 
-# Dependency to get DB Session
-def get_db():
-    db = SessionLocal()
-    try:
+# Dependency to get an async DB Session, used by the async routes that write
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
+
+# Dependency to get a read-only async DB Session, used by the GET routes
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,24 @@
+import base64
+import json
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Query
+
+
+def encode_sync_token(versions: Dict[str, int]) -> str:
+    payload = json.dumps(versions, sort_keys=True).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Dict[str, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return {str(table): int(version) for table, version in payload.items()}
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+# Dependency to get the change versions a sync client is current to, None for a full sync
+def get_sync_since(since: Optional[str] = Query(None)) -> Optional[Dict[str, int]]:
+    return decode_sync_token(since) if since else None
@@ -16,17 +16,18 @@ class ErrorResponse(BaseModel):
     }
 
 
-async def http422_error_handler(_: Request, exc: RequestValidationError):
+async def http422_error_handler(request: Request, exc: RequestValidationError):
     errors = []
     for error in exc.errors():
         field = " -> ".join(str(loc) for loc in error['loc'])
         message = error['msg']
         error_detail = f"Error in field '{field}': {message}"
         errors.append(error_detail)
-        logger.error(error_detail)  # Log the error details
+    # Log all field errors of the request as one record
+    logger.error(f"Validation failed for {request.method} {request.url.path}: {'; '.join(errors)}")
 
     error_response = ErrorResponse(status=422, message=errors)
     return JSONResponse(
         status_code=422,
-        message=error_response.model_dump()
+        content=error_response.model_dump()
     )
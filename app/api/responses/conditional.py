@@ -0,0 +1,103 @@
+import datetime
+import zlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def entity_etag(table: str, id: int, updated_at: datetime.datetime) -> str:
+    micros = int(updated_at.replace(tzinfo=datetime.timezone.utc).timestamp() * 1_000_000)
+    return f'"{table}-{id}-{micros}"'
+
+
+def collection_etag(table: str, version: int, request: Request) -> str:
+    # Tie the validator to the representation, list pages differ by query and Accept header
+    variant = zlib.crc32(f"{request.url.query}|{request.headers.get('accept', '')}".encode())
+    return f'"{table}-v{version}-{variant:08x}"'
+
+
+def http_date(value: datetime.datetime) -> str:
+    return format_datetime(value.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+
+
+def _etags(header: str) -> set:
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+async def entity_validators(crud, id: int) -> Tuple[Optional[str], Optional[datetime.datetime]]:
+    """ETag and Last-Modified of a row from its ``updated_at``, without loading the entity"""
+    updated_at = await crud.get_updated_at(id)
+    if updated_at is None:
+        return None, None
+    return entity_etag(crud.model.__tablename__, id, updated_at), updated_at
+
+
+async def collection_validator(crud, request: Request) -> Optional[str]:
+    """ETag of a list response from the change counter of the table"""
+    version = await crud.get_table_version()
+    if version is None:
+        return None
+    return collection_etag(crud.model.__tablename__, version, request)
+
+
+async def view_validator(crud, id: int, request: Request) -> Optional[str]:
+    """ETag of a board view from the change counters of the boards, statuses and tickets"""
+    version = await crud.get_view_version()
+    if version is None:
+        return None
+    return collection_etag(f"{crud.model.__tablename__}-{id}-view", version, request)
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime.datetime] = None) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since when it is absent"""
+    if etag is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etags(if_none_match)
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        modified = last_modified.replace(tzinfo=datetime.timezone.utc, microsecond=0)
+        return modified <= since
+    return False
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime.datetime] = None) -> Response:
+    response = Response(status_code=304)
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response: Response, etag: Optional[str], last_modified: Optional[datetime.datetime] = None) -> None:
+    if etag is None:
+        return
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+
+def set_entity_validators(response: Response, crud, item) -> None:
+    if item is not None and item.updated_at is not None:
+        etag = entity_etag(crud.model.__tablename__, item.id, item.updated_at)
+        set_validators(response, etag, item.updated_at)
+
+
+async def check_if_match(request: Request, crud, id: int) -> None:
+    """Raise 412 when the client's If-Match does not match the current representation"""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    # Without write coalescing the check and the write then run in one transaction holding the write lock
+    await crud.begin_write()
+    etag, _ = await entity_validators(crud, id)
+    tags = {tag.strip() for tag in if_match.split(",")}
+    if etag is None or ("*" not in tags and etag not in tags):
+        raise HTTPException(status_code=412, detail="Precondition Failed: the resource has been modified")
@@ -0,0 +1,63 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from pydantic_core import to_json
+from starlette.responses import StreamingResponse
+
+from app.db_models.changes import ChangeEvent, change_bus
+
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+KEEPALIVE = b": keepalive\n\n"
+
+
+def format_event(event: ChangeEvent) -> bytes:
+    """One SSE message named ``<table>.<op>``, its id is the bus sequence number used by Last-Event-ID"""
+    data = to_json({"table": event.table, "op": event.op, "id": event.row_id, "data": event.data})
+    return b"id: %d\nevent: %s.%s\ndata: %s\n\n" % (event.id, event.table.encode(), event.op.encode(), data)
+
+
+def format_reset(last_id: int) -> bytes:
+    """Tells the client that buffered events were lost and it has to reload the board"""
+    return b"id: %d\nevent: reset\ndata: {}\n\n" % last_id
+
+
+async def _board_events(board_id: int, last_event_id: Optional[int], keepalive: float) -> AsyncIterator[bytes]:
+    subscription = change_bus.subscribe(board_id)
+    last_id = change_bus.last_id if last_event_id is None else last_event_id
+    # Replay what was missed before the connection (Last-Event-ID) or while the queue was full
+    replay = last_event_id is not None
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            if replay or subscription.lagging:
+                subscription.drain()
+                events, complete = change_bus.since(last_id, board_id)
+                if not complete:
+                    last_id = change_bus.last_id
+                    yield format_reset(last_id)
+                    events = [event for event in events if event.id > last_id]
+                for event in events:
+                    last_id = event.id
+                    yield format_event(event)
+                replay = False
+                continue
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            if event.id > last_id:
+                last_id = event.id
+                yield format_event(event)
+    finally:
+        change_bus.unsubscribe(subscription)
+
+
+def event_stream_response(board_id: int, last_event_id: Optional[int], keepalive: float = 15.0) -> StreamingResponse:
+    """Server-Sent Events stream of the committed changes of a board, resuming after ``last_event_id``"""
+    return StreamingResponse(
+        _board_events(board_id, last_event_id, keepalive),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
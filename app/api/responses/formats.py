@@ -0,0 +1,94 @@
+"""Binary response formats of the list routes, each backed by an optional dependency.
+
+MessagePack (``msgpack``) encodes the same page documents as the JSON responses,
+see ``serialization.dump_msgpack``. Arrow IPC (``pyarrow``) streams every matching
+row as columnar record batches, one batch per chunk fetched from the database.
+"""
+import datetime
+import typing
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, List, Type
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - optional format
+    pyarrow = None
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+@lru_cache(maxsize=None)
+def arrow_schema(schema: Type[BaseModel]) -> "pyarrow.Schema":
+    """Arrow schema with one column per field of a response model"""
+    types = {
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        str: pyarrow.string(),
+        bool: pyarrow.bool_(),
+        datetime.datetime: pyarrow.timestamp("us"),
+    }
+    fields = []
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        nullable = type(None) in typing.get_args(annotation)
+        if nullable:
+            annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+        fields.append(pyarrow.field(name, types[annotation], nullable=nullable))
+    return pyarrow.schema(fields)
+
+
+class _ChunkSink:
+    """File-like object collecting what the Arrow stream writer emits until it is taken"""
+    closed = False
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def _arrow_stream(partitions: AsyncIterable[list], schema: Type[BaseModel], db: AsyncSession) -> AsyncIterator[bytes]:
+    record_schema = arrow_schema(schema)
+    sink = _ChunkSink()
+    try:
+        with pyarrow.ipc.new_stream(sink, record_schema) as writer:
+            async for rows in partitions:
+                columns = {name: [getattr(row, name) for row in rows] for name in record_schema.names}
+                writer.write_batch(pyarrow.RecordBatch.from_pydict(columns, schema=record_schema))
+                yield sink.take()
+        yield sink.take()
+    finally:
+        # The body is sent after the request scope, release the connection ourselves
+        await db.close()
+
+
+def arrow_response(partitions: AsyncIterable[list], schema: Type[BaseModel], db: AsyncSession) -> StreamingResponse:
+    """Stream chunks of column rows as an Arrow IPC stream, one record batch per chunk"""
+    return StreamingResponse(_arrow_stream(partitions, schema, db), media_type=ARROW_STREAM_MEDIA_TYPE)
@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+
+from app.api.dependencies.pagination import PageParams
+from app.api.responses.conditional import set_validators
+from app.api.responses.formats import MSGPACK_MEDIA_TYPE, msgpack
+from app.api_models.pagination import Page
+
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """One adapter per response type, building its validator and serializer is the expensive part"""
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, content: Any) -> bytes:
+    """Validate ``content`` (rows, mappings or ORM objects) as ``schema`` in one pass and encode it to JSON"""
+    adapter = type_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def dump_msgpack(schema: Any, content: Any) -> bytes:
+    """MessagePack counterpart of ``dump_json``, datetimes are encoded as ISO 8601 strings like in JSON"""
+    adapter = type_adapter(schema)
+    return msgpack.packb(adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json"))
+
+
+ENCODERS: Dict[str, Callable[[Any, Any], bytes]] = {
+    JSON_MEDIA_TYPE: dump_json,
+    MSGPACK_MEDIA_TYPE: dump_msgpack,
+}
+
+
+def json_response(schema: Any, content: Any, status_code: int = 200) -> Response:
+    return Response(dump_json(schema, content), status_code=status_code, media_type=JSON_MEDIA_TYPE)
+
+
+def page_response(schema: Type[BaseModel], rows: Sequence, has_more: bool, page: PageParams,
+                  etag: Optional[str] = None, media_type: str = JSON_MEDIA_TYPE) -> Response:
+    """Keyset page of column rows serialized as ``Page[schema]`` in ``media_type``, with its collection ETag"""
+    body = ENCODERS[media_type](Page[schema], page.to_response(rows, has_more))
+    response = Response(body, media_type=media_type)
+    set_validators(response, etag)
+    return response
+
+
+def list_response(schema: Type[BaseModel], items: List[Any]) -> Response:
+    return json_response(List[schema], items)
@@ -0,0 +1,24 @@
+from typing import AsyncIterable, AsyncIterator, Type
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+
+from app.api.responses.serialization import dump_json
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def _ndjson_lines(items: AsyncIterable, schema: Type[BaseModel], db: AsyncSession) -> AsyncIterator[bytes]:
+    try:
+        async for item in items:
+            yield dump_json(schema, item) + b"\n"
+    finally:
+        # The body is sent after the request scope, release the connection ourselves
+        await db.close()
+
+
+def ndjson_response(items: AsyncIterable, schema: Type[BaseModel], db: AsyncSession) -> StreamingResponse:
+    """Stream ``items`` as newline delimited JSON, one ``schema`` document per line"""
+    return StreamingResponse(_ndjson_lines(items, schema, db), media_type=NDJSON_MEDIA_TYPE)
@@ -1,4 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.logging import logging_stats
+from app.core.metrics import registry
+from app.db_models.cache import entity_cache
 
 
 router = APIRouter()
@@ -12,3 +17,18 @@ async def home():
 @router.get("/health", status_code=200)
 async def health():
     return "OK"
+
+
+@router.get("/health/cache", status_code=200)
+async def cache_health():
+    return entity_cache.stats()
+
+
+@router.get("/health/logging", status_code=200)
+async def logging_health():
+    return logging_stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, status_code=200)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
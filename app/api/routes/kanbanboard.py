@@ -1,46 +1,143 @@
 from fastapi import APIRouter, HTTPException
-from sqlalchemy.orm import Session
-from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Header, Query, Request, Response
+from typing import Optional
 
-from app.db_models.crud import KanbanBoardCRUD, KanbanStatusCRUD
-from app.api_models.kanbanboard import KanbanBoardCreate, KanbanBoardResponse
-from app.api.dependencies.sqldb import get_db
+from app.db_models.async_crud import AsyncKanbanBoardCRUD, AsyncKanbanStatusCRUD
+from app.db_models.coalescer import coalesced
+from app.api_models.kanbanboard import KanbanBoardCreate, KanbanBoardPatch, KanbanBoardResponse, KanbanBoardView
+from app.api_models.pagination import Page
+from app.api_models.stats import TicketStats
+from app.api.dependencies.sqldb import get_async_db, get_async_read_db
+from app.api.dependencies.pagination import PageParams, get_page_params
+from app.api.dependencies.negotiation import ResponseFormat, get_response_format, vary_on_accept
+from app.api.responses.serialization import json_response, page_response
+from app.api.responses.formats import arrow_response
+from app.api.responses.streaming import ndjson_response
+from app.api.responses.events import event_stream_response
+from app.core.config import get_app_settings
+from app.api.responses.conditional import (
+    check_if_match,
+    collection_validator,
+    entity_validators,
+    is_not_modified,
+    not_modified_response,
+    set_entity_validators,
+    set_validators,
+    view_validator,
+)
 
 
 router = APIRouter()
 
 
 @router.post("/", status_code=201, response_model=KanbanBoardResponse)
-def create_kanban_board(kanban_board: KanbanBoardCreate, db: Session = Depends(get_db)):
-    kanban_board_crud = KanbanBoardCRUD(db)
-    return kanban_board_crud.create(**kanban_board.model_dump())
+async def create_kanban_board(kanban_board: KanbanBoardCreate, db: AsyncSession = Depends(get_async_db)):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    return await coalesced(kanban_board_crud.create, **kanban_board.model_dump())
 
 
-@router.get("/", status_code=200, response_model=list[KanbanBoardResponse])
-def get_all_kanban_boards(db: Session = Depends(get_db)):
-    kanban_board_crud = KanbanBoardCRUD(db)
-    return kanban_board_crud.get_all()
+@router.get("/", status_code=200, response_model=Page[KanbanBoardResponse])
+async def get_all_kanban_boards(
+    request: Request,
+    page: PageParams = Depends(get_page_params),
+    response_format: ResponseFormat = Depends(get_response_format),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    etag = await collection_validator(kanban_board_crud, request)
+    if is_not_modified(request, etag):
+        return vary_on_accept(not_modified_response(etag))
+    if response_format == ResponseFormat.ndjson:
+        return vary_on_accept(ndjson_response(kanban_board_crud.stream(after_id=page.after_id), KanbanBoardResponse, db))
+    if response_format == ResponseFormat.arrow:
+        return vary_on_accept(arrow_response(kanban_board_crud.stream_rows(after_id=page.after_id), KanbanBoardResponse, db))
+    kanban_boards, has_more = await kanban_board_crud.get_page_rows(page.limit, page.after_id)
+    return vary_on_accept(page_response(KanbanBoardResponse, kanban_boards, has_more, page, etag, response_format.value))
 
 
 @router.get("/{id}", status_code=200, response_model=KanbanBoardResponse)
-def get_kanban_board(id: int, db: Session = Depends(get_db)):
-    kanban_board_crud = KanbanBoardCRUD(db)
-    kanban_board = kanban_board_crud.get(id)
+async def get_kanban_board(id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    etag, updated_at = await entity_validators(kanban_board_crud, id)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified_response(etag, updated_at)
+    kanban_board = await kanban_board_crud.get(id)
     if not kanban_board:
         raise HTTPException(status_code=404, detail=f"Kanban Board with id {id} not found")
+    set_validators(response, etag, updated_at)
     return kanban_board
 
 
+@router.get("/{id}/view", status_code=200, response_model=KanbanBoardView)
+async def get_kanban_board_view(
+    id: int,
+    request: Request,
+    response: Response,
+    tickets_per_column: int = Query(20, ge=0, le=200),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    etag = await view_validator(kanban_board_crud, id, request)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    kanban_board_view = await kanban_board_crud.get_view(id, tickets_per_column)
+    if not kanban_board_view:
+        raise HTTPException(status_code=404, detail=f"Kanban Board with id {id} not found")
+    set_validators(response, etag)
+    return kanban_board_view
+
+
+@router.get("/{id}/stats", status_code=200, response_model=TicketStats)
+async def get_kanban_board_stats(id: int, db: AsyncSession = Depends(get_async_read_db)):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    stats = await kanban_board_crud.get_stats(id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Kanban Board with id {id} not found")
+    return json_response(TicketStats, stats)
+
+
+@router.get("/{id}/events", status_code=200)
+async def get_kanban_board_events(
+    id: int,
+    last_event_id: Optional[int] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    if not await kanban_board_crud.get(id):
+        raise HTTPException(status_code=404, detail=f"Kanban Board with id {id} not found")
+    # Idle subscribers must not hold a pooled connection
+    await db.close()
+    return event_stream_response(id, last_event_id, get_app_settings().change_feed_keepalive)
+
+
 @router.put("/{id}", status_code=200, response_model=KanbanBoardResponse)
-def update_kanban_board(id: int, kanban_board: KanbanBoardCreate, db: Session = Depends(get_db)):
-    kanban_board_crud = KanbanBoardCRUD(db)
-    kanban_board_crud.update(id, **kanban_board.model_dump())
-    return kanban_board_crud.get(id)
+async def update_kanban_board(id: int, kanban_board: KanbanBoardCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    await check_if_match(request, kanban_board_crud, id)
+    updated = await coalesced(kanban_board_crud.update, id, **kanban_board.model_dump())
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Kanban Board with id {id} not found")
+    set_entity_validators(response, kanban_board_crud, updated)
+    return updated
+
+
+@router.patch("/{id}", status_code=200, response_model=KanbanBoardResponse)
+async def patch_kanban_board(id: int, kanban_board: KanbanBoardPatch, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    await check_if_match(request, kanban_board_crud, id)
+    updated = await coalesced(kanban_board_crud.patch, id, **kanban_board.model_dump(exclude_unset=True))
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Kanban Board with id {id} not found")
+    set_entity_validators(response, kanban_board_crud, updated)
+    return updated
 
 
 @router.delete("/{id}", status_code=204)
-def delete_kanban_board(id: int, db: Session = Depends(get_db)):
-    kanban_board_crud = KanbanBoardCRUD(db)
-    kanban_board_crud.delete(id)
+async def delete_kanban_board(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    kanban_board_crud = AsyncKanbanBoardCRUD(db)
+    await check_if_match(request, kanban_board_crud, id)
+    if await coalesced(kanban_board_crud.delete, id) is None:
+        raise HTTPException(status_code=404, detail=f"Kanban Board with id {id} not found")
     return {"message": "Kanban Board deleted successfully"}
 
@@ -1,46 +1,122 @@
 from fastapi import APIRouter, HTTPException
-from sqlalchemy.orm import Session
-from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request, Response
+from typing import Optional
 
-from app.db_models.crud import KanbanStatusCRUD
-from app.api_models.kanbanstatus import KanbanStatusCreate, KanbanStatusResponse
-from app.api.dependencies.sqldb import get_db
+from app.db_models.async_crud import AsyncKanbanStatusCRUD
+from app.db_models.coalescer import coalesced
+from app.api_models.kanbanstatus import KanbanStatusCreate, KanbanStatusPatch, KanbanStatusBulkUpdate, KanbanStatusResponse
+from app.api_models.bulk import BulkDelete, BulkItemResult
+from app.api_models.pagination import Page
+from app.api.dependencies.sqldb import get_async_db, get_async_read_db
+from app.api.dependencies.pagination import PageParams, get_page_params
+from app.api.dependencies.negotiation import ResponseFormat, get_response_format, vary_on_accept
+from app.api.responses.serialization import page_response
+from app.api.responses.formats import arrow_response
+from app.api.responses.streaming import ndjson_response
+from app.api.responses.conditional import (
+    check_if_match,
+    collection_validator,
+    entity_validators,
+    is_not_modified,
+    not_modified_response,
+    set_entity_validators,
+    set_validators,
+)
 
 
 router = APIRouter()
 
 
 @router.post("/", status_code=201, response_model=KanbanStatusResponse)
-def create_kanban_status(kanban_status: KanbanStatusCreate, db: Session = Depends(get_db)):
-    kanban_status_crud = KanbanStatusCRUD(db)
-    return kanban_status_crud.create(**kanban_status.model_dump())
+async def create_kanban_status(kanban_status: KanbanStatusCreate, db: AsyncSession = Depends(get_async_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    return await coalesced(kanban_status_crud.create, **kanban_status.model_dump())
 
 
-@router.get("/", status_code=200, response_model=list[KanbanStatusResponse])
-def get_all_kanban_statuses(db: Session = Depends(get_db)):
-    kanban_status_crud = KanbanStatusCRUD(db)
-    return kanban_status_crud.get_all()
+@router.post("/bulk", status_code=201, response_model=list[KanbanStatusResponse])
+async def bulk_create_kanban_statuses(kanban_statuses: list[KanbanStatusCreate], db: AsyncSession = Depends(get_async_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    return await kanban_status_crud.bulk_create([kanban_status.model_dump() for kanban_status in kanban_statuses])
+
+
+@router.patch("/bulk", status_code=200, response_model=list[BulkItemResult])
+async def bulk_update_kanban_statuses(kanban_statuses: list[KanbanStatusBulkUpdate], db: AsyncSession = Depends(get_async_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    updated = await kanban_status_crud.bulk_update([kanban_status.model_dump(exclude_unset=True) for kanban_status in kanban_statuses])
+    return [
+        {"id": kanban_status.id, "status": "updated" if kanban_status.id in updated else "not_found"}
+        for kanban_status in kanban_statuses
+    ]
+
+
+@router.delete("/bulk", status_code=200, response_model=list[BulkItemResult])
+async def bulk_delete_kanban_statuses(bulk_delete: BulkDelete, db: AsyncSession = Depends(get_async_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    deleted = await kanban_status_crud.bulk_delete(bulk_delete.ids)
+    return [{"id": id, "status": "deleted" if id in deleted else "not_found"} for id in bulk_delete.ids]
+
+
+@router.get("/", status_code=200, response_model=Page[KanbanStatusResponse])
+async def get_all_kanban_statuses(
+    request: Request,
+    board_id: Optional[int] = None,
+    page: PageParams = Depends(get_page_params),
+    response_format: ResponseFormat = Depends(get_response_format),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    etag = await collection_validator(kanban_status_crud, request)
+    if is_not_modified(request, etag):
+        return vary_on_accept(not_modified_response(etag))
+    if response_format == ResponseFormat.ndjson:
+        return vary_on_accept(ndjson_response(kanban_status_crud.stream(after_id=page.after_id, board_id=board_id), KanbanStatusResponse, db))
+    if response_format == ResponseFormat.arrow:
+        return vary_on_accept(arrow_response(kanban_status_crud.stream_rows(after_id=page.after_id, board_id=board_id), KanbanStatusResponse, db))
+    kanban_statuses, has_more = await kanban_status_crud.get_page_rows(page.limit, page.after_id, board_id=board_id)
+    return vary_on_accept(page_response(KanbanStatusResponse, kanban_statuses, has_more, page, etag, response_format.value))
 
 
 @router.get("/{id}", status_code=200, response_model=KanbanStatusResponse)
-def get_kanban_status(id: int, db: Session = Depends(get_db)):
-    kanban_status_crud = KanbanStatusCRUD(db)
-    kanban_status = kanban_status_crud.get(id)
+async def get_kanban_status(id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    etag, updated_at = await entity_validators(kanban_status_crud, id)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified_response(etag, updated_at)
+    kanban_status = await kanban_status_crud.get(id)
     if not kanban_status:
         raise HTTPException(status_code=404, detail=f"Kanban Status with id {id} not found")
+    set_validators(response, etag, updated_at)
     return kanban_status
 
 
 @router.put("/{id}", status_code=200, response_model=KanbanStatusResponse)
-def update_kanban_status(id: int, kanban_status: KanbanStatusCreate, db: Session = Depends(get_db)):
-    kanban_status_crud = KanbanStatusCRUD(db)
-    kanban_status_crud.update(id, **kanban_status.model_dump())
-    return kanban_status_crud.get(id)
+async def update_kanban_status(id: int, kanban_status: KanbanStatusCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    await check_if_match(request, kanban_status_crud, id)
+    updated = await coalesced(kanban_status_crud.update, id, **kanban_status.model_dump())
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Kanban Status with id {id} not found")
+    set_entity_validators(response, kanban_status_crud, updated)
+    return updated
+
+
+@router.patch("/{id}", status_code=200, response_model=KanbanStatusResponse)
+async def patch_kanban_status(id: int, kanban_status: KanbanStatusPatch, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    await check_if_match(request, kanban_status_crud, id)
+    updated = await coalesced(kanban_status_crud.patch, id, **kanban_status.model_dump(exclude_unset=True))
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Kanban Status with id {id} not found")
+    set_entity_validators(response, kanban_status_crud, updated)
+    return updated
 
 
 @router.delete("/{id}", status_code=204)
-def delete_kanban_status(id: int, db: Session = Depends(get_db)):
-    kanban_status_crud = KanbanStatusCRUD(db)
-    kanban_status_crud.delete(id)
+async def delete_kanban_status(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    kanban_status_crud = AsyncKanbanStatusCRUD(db)
+    await check_if_match(request, kanban_status_crud, id)
+    if await coalesced(kanban_status_crud.delete, id) is None:
+        raise HTTPException(status_code=404, detail=f"Kanban Status with id {id} not found")
     return {"message": "Kanban Status deleted successfully"}
 
@@ -1,47 +1,133 @@
 # Project Endpoints
 from fastapi import APIRouter, HTTPException
-from sqlalchemy.orm import Session
-from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request, Response
+from typing import Optional
 
-from app.db_models.crud import ProjectCRUD
-from app.api_models.projects import ProjectCreate, ProjectResponse
-from app.api.dependencies.sqldb import get_db
+from app.db_models.async_crud import AsyncProjectCRUD
+from app.db_models.coalescer import coalesced
+from app.api_models.projects import ProjectCreate, ProjectPatch, ProjectBulkUpdate, ProjectResponse
+from app.api_models.bulk import BulkDelete, BulkItemResult
+from app.api_models.pagination import Page
+from app.api_models.stats import TicketStats
+from app.api.dependencies.sqldb import get_async_db, get_async_read_db
+from app.api.dependencies.pagination import PageParams, get_page_params
+from app.api.dependencies.negotiation import ResponseFormat, get_response_format, vary_on_accept
+from app.api.responses.serialization import json_response, page_response
+from app.api.responses.formats import arrow_response
+from app.api.responses.streaming import ndjson_response
+from app.api.responses.conditional import (
+    check_if_match,
+    collection_validator,
+    entity_validators,
+    is_not_modified,
+    not_modified_response,
+    set_entity_validators,
+    set_validators,
+)
 
 
 router = APIRouter()
 
 
 @router.post("/", status_code=201, response_model=ProjectResponse)
-def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
-    project_crud = ProjectCRUD(db)
-    return project_crud.create(**project.model_dump())
+async def create_project(project: ProjectCreate, db: AsyncSession = Depends(get_async_db)):
+    project_crud = AsyncProjectCRUD(db)
+    return await coalesced(project_crud.create, **project.model_dump())
 
 
-@router.get("/", status_code=200, response_model=list[ProjectResponse])
-def get_all_projects(db: Session = Depends(get_db)):
-    project_crud = ProjectCRUD(db)
-    return project_crud.get_all()
+@router.post("/bulk", status_code=201, response_model=list[ProjectResponse])
+async def bulk_create_projects(projects: list[ProjectCreate], db: AsyncSession = Depends(get_async_db)):
+    project_crud = AsyncProjectCRUD(db)
+    return await project_crud.bulk_create([project.model_dump() for project in projects])
+
+
+@router.patch("/bulk", status_code=200, response_model=list[BulkItemResult])
+async def bulk_update_projects(projects: list[ProjectBulkUpdate], db: AsyncSession = Depends(get_async_db)):
+    project_crud = AsyncProjectCRUD(db)
+    updated = await project_crud.bulk_update([project.model_dump(exclude_unset=True) for project in projects])
+    return [
+        {"id": project.id, "status": "updated" if project.id in updated else "not_found"}
+        for project in projects
+    ]
+
+
+@router.delete("/bulk", status_code=200, response_model=list[BulkItemResult])
+async def bulk_delete_projects(bulk_delete: BulkDelete, db: AsyncSession = Depends(get_async_db)):
+    project_crud = AsyncProjectCRUD(db)
+    deleted = await project_crud.bulk_delete(bulk_delete.ids)
+    return [{"id": id, "status": "deleted" if id in deleted else "not_found"} for id in bulk_delete.ids]
+
+
+@router.get("/", status_code=200, response_model=Page[ProjectResponse])
+async def get_all_projects(
+    request: Request,
+    kanban_board_id: Optional[int] = None,
+    page: PageParams = Depends(get_page_params),
+    response_format: ResponseFormat = Depends(get_response_format),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    project_crud = AsyncProjectCRUD(db)
+    etag = await collection_validator(project_crud, request)
+    if is_not_modified(request, etag):
+        return vary_on_accept(not_modified_response(etag))
+    if response_format == ResponseFormat.ndjson:
+        return vary_on_accept(ndjson_response(project_crud.stream(after_id=page.after_id, kanban_board_id=kanban_board_id), ProjectResponse, db))
+    if response_format == ResponseFormat.arrow:
+        return vary_on_accept(arrow_response(project_crud.stream_rows(after_id=page.after_id, kanban_board_id=kanban_board_id), ProjectResponse, db))
+    projects, has_more = await project_crud.get_page_rows(page.limit, page.after_id, kanban_board_id=kanban_board_id)
+    return vary_on_accept(page_response(ProjectResponse, projects, has_more, page, etag, response_format.value))
 
 
 @router.get("/{id}", status_code=200, response_model=ProjectResponse)
-def get_project(id: int, db: Session = Depends(get_db)):
-    project_crud = ProjectCRUD(db)
-    project = project_crud.get(id)
+async def get_project(id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    project_crud = AsyncProjectCRUD(db)
+    etag, updated_at = await entity_validators(project_crud, id)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified_response(etag, updated_at)
+    project = await project_crud.get(id)
     if not project:
         raise HTTPException(status_code=404, detail=f"Project with id {id} not found")
+    set_validators(response, etag, updated_at)
     return project
 
 
+@router.get("/{id}/stats", status_code=200, response_model=TicketStats)
+async def get_project_stats(id: int, db: AsyncSession = Depends(get_async_read_db)):
+    project_crud = AsyncProjectCRUD(db)
+    stats = await project_crud.get_stats(id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Project with id {id} not found")
+    return json_response(TicketStats, stats)
+
+
 @router.put("/{id}", status_code=200, response_model=ProjectResponse)
-def update_project(id: int, project: ProjectCreate, db: Session = Depends(get_db)):
-    project_crud = ProjectCRUD(db)
-    project_crud.update(id, **project.model_dump())
-    return project_crud.get(id)
+async def update_project(id: int, project: ProjectCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    project_crud = AsyncProjectCRUD(db)
+    await check_if_match(request, project_crud, id)
+    updated = await coalesced(project_crud.update, id, **project.model_dump())
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Project with id {id} not found")
+    set_entity_validators(response, project_crud, updated)
+    return updated
+
+
+@router.patch("/{id}", status_code=200, response_model=ProjectResponse)
+async def patch_project(id: int, project: ProjectPatch, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    project_crud = AsyncProjectCRUD(db)
+    await check_if_match(request, project_crud, id)
+    updated = await coalesced(project_crud.patch, id, **project.model_dump(exclude_unset=True))
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Project with id {id} not found")
+    set_entity_validators(response, project_crud, updated)
+    return updated
 
 
 @router.delete("/{id}", status_code=204)
-def delete_project(id: int, db: Session = Depends(get_db)):
-    project_crud = ProjectCRUD(db)
-    project_crud.delete(id)
+async def delete_project(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    project_crud = AsyncProjectCRUD(db)
+    await check_if_match(request, project_crud, id)
+    if await coalesced(project_crud.delete, id) is None:
+        raise HTTPException(status_code=404, detail=f"Project with id {id} not found")
     return {"message": "Project deleted successfully"}
 
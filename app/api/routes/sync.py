@@ -0,0 +1,21 @@
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db_models.async_crud import AsyncDeltaCRUD
+from app.api_models.sync import SyncResponse
+from app.api.dependencies.sqldb import get_async_read_db
+from app.api.dependencies.sync import encode_sync_token, get_sync_since
+from app.api.responses.serialization import json_response
+
+
+router = APIRouter()
+
+
+@router.get("", status_code=200, response_model=SyncResponse)
+async def get_changes(since: Optional[Dict[str, int]] = Depends(get_sync_since), db: AsyncSession = Depends(get_async_read_db)):
+    delta_crud = AsyncDeltaCRUD(db)
+    changes = await delta_crud.get_changes(since)
+    token = encode_sync_token(changes.pop("versions"))
+    return json_response(SyncResponse, {**changes, "token": token})
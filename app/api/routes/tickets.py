@@ -1,46 +1,163 @@
 from fastapi import APIRouter, HTTPException
-from sqlalchemy.orm import Session
-from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import BackgroundTasks, Depends, Query, Request, Response
+from typing import Optional
 
-from app.db_models.crud import TicketCRUD
-from app.api_models.tickets import TicketCreate, TicketResponse
-from app.api.dependencies.sqldb import get_db
+from app.db_models.async_crud import AsyncTicketCRUD
+from app.db_models.coalescer import coalesced
+from app.api_models.tickets import TicketCreate, TicketPatch, TicketBulkUpdate, TicketMove, TicketResponse, TicketSearchResult
+from app.api_models.bulk import BulkDelete, BulkItemResult
+from app.api_models.pagination import Page
+from app.api.dependencies.sqldb import get_async_db, get_async_read_db
+from app.core.config import get_app_settings
+from app.db_models.session import AsyncSessionLocal
+from app.api.dependencies.pagination import PageParams, get_page_params
+from app.api.dependencies.negotiation import ResponseFormat, get_response_format, vary_on_accept
+from app.api.responses.serialization import list_response, page_response
+from app.api.responses.formats import arrow_response
+from app.api.responses.streaming import ndjson_response
+from app.api.responses.conditional import (
+    check_if_match,
+    collection_validator,
+    entity_validators,
+    is_not_modified,
+    not_modified_response,
+    set_entity_validators,
+    set_validators,
+)
 
 
 router = APIRouter()
 
 
+async def rebalance_column(kanban_status_id: int) -> None:
+    # Runs after the response, on its own session
+    async with AsyncSessionLocal() as db:
+        await AsyncTicketCRUD(db).rebalance(kanban_status_id)
+
+
 @router.post("/", status_code=201, response_model=TicketResponse)
-def create_ticket(ticket: TicketCreate, db: Session = Depends(get_db)):
-    ticket_crud = TicketCRUD(db)
-    return ticket_crud.create(**ticket.model_dump())
+async def create_ticket(ticket: TicketCreate, db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    return await coalesced(ticket_crud.create, **ticket.model_dump())
+
+
+@router.post("/bulk", status_code=201, response_model=list[TicketResponse])
+async def bulk_create_tickets(tickets: list[TicketCreate], db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    return await ticket_crud.bulk_create([ticket.model_dump() for ticket in tickets])
+
+
+@router.patch("/bulk", status_code=200, response_model=list[BulkItemResult])
+async def bulk_update_tickets(tickets: list[TicketBulkUpdate], db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    updated = await ticket_crud.bulk_update([ticket.model_dump(exclude_unset=True) for ticket in tickets])
+    return [
+        {"id": ticket.id, "status": "updated" if ticket.id in updated else "not_found"}
+        for ticket in tickets
+    ]
+
+
+@router.delete("/bulk", status_code=200, response_model=list[BulkItemResult])
+async def bulk_delete_tickets(bulk_delete: BulkDelete, db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    deleted = await ticket_crud.bulk_delete(bulk_delete.ids)
+    return [{"id": id, "status": "deleted" if id in deleted else "not_found"} for id in bulk_delete.ids]
+
 
+@router.get("/", status_code=200, response_model=Page[TicketResponse])
+async def get_all_tickets(
+    request: Request,
+    project_id: Optional[int] = None,
+    kanban_status_id: Optional[int] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    include_archived: bool = False,
+    page: PageParams = Depends(get_page_params),
+    response_format: ResponseFormat = Depends(get_response_format),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    ticket_crud = AsyncTicketCRUD(db)
+    etag = await collection_validator(ticket_crud, request)
+    if is_not_modified(request, etag):
+        return vary_on_accept(not_modified_response(etag))
+    if response_format == ResponseFormat.ndjson:
+        return vary_on_accept(ndjson_response(ticket_crud.stream(after_id=page.after_id, project_id=project_id, kanban_status_id=kanban_status_id, status=status, priority=priority, include_archived=include_archived), TicketResponse, db))
+    if response_format == ResponseFormat.arrow:
+        return vary_on_accept(arrow_response(ticket_crud.stream_rows(after_id=page.after_id, project_id=project_id, kanban_status_id=kanban_status_id, status=status, priority=priority, include_archived=include_archived), TicketResponse, db))
+    tickets, has_more = await ticket_crud.get_page_rows(page.limit, page.after_id, project_id=project_id, kanban_status_id=kanban_status_id, status=status, priority=priority, include_archived=include_archived)
+    return vary_on_accept(page_response(TicketResponse, tickets, has_more, page, etag, response_format.value))
 
-@router.get("/", status_code=200, response_model=list[TicketResponse])
-def get_all_tickets(db: Session = Depends(get_db)):
-    ticket_crud = TicketCRUD(db)
-    return ticket_crud.get_all()
+
+@router.get("/search", status_code=200, response_model=list[TicketSearchResult])
+async def search_tickets(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    ticket_crud = AsyncTicketCRUD(db)
+    return list_response(TicketSearchResult, await ticket_crud.search(q, limit, offset))
 
 
 @router.get("/{id}", status_code=200, response_model=TicketResponse)
-def get_ticket(id: int, db: Session = Depends(get_db)):
-    ticket_crud = TicketCRUD(db)
-    ticket = ticket_crud.get(id)
+async def get_ticket(id: int, request: Request, response: Response, include_archived: bool = False,
+                     db: AsyncSession = Depends(get_async_read_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    etag, updated_at = await entity_validators(ticket_crud, id)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified_response(etag, updated_at)
+    ticket = await ticket_crud.get(id, include_archived)
     if not ticket:
         raise HTTPException(status_code=404, detail=f"Ticket with id {id} not found")
+    set_validators(response, etag, updated_at)
     return ticket
 
 
 @router.put("/{id}", status_code=200, response_model=TicketResponse)
-def update_ticket(id: int, ticket: TicketCreate, db: Session = Depends(get_db)):
-    ticket_crud = TicketCRUD(db)
-    ticket_crud.update(id, **ticket.model_dump())
-    return ticket_crud.get(id)
+async def update_ticket(id: int, ticket: TicketCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    await check_if_match(request, ticket_crud, id)
+    updated = await coalesced(ticket_crud.update, id, **ticket.model_dump())
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Ticket with id {id} not found")
+    set_entity_validators(response, ticket_crud, updated)
+    return updated
+
+
+@router.patch("/{id}", status_code=200, response_model=TicketResponse)
+async def patch_ticket(id: int, ticket: TicketPatch, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    await check_if_match(request, ticket_crud, id)
+    updated = await coalesced(ticket_crud.patch, id, **ticket.model_dump(exclude_unset=True))
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"Ticket with id {id} not found")
+    set_entity_validators(response, ticket_crud, updated)
+    return updated
+
+
+@router.post("/{id}/move", status_code=200, response_model=TicketResponse)
+async def move_ticket(id: int, move: TicketMove, background_tasks: BackgroundTasks, request: Request, response: Response,
+                      db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    await check_if_match(request, ticket_crud, id)
+    try:
+        moved = await coalesced(ticket_crud.move, id, **move.model_dump())
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    if not moved:
+        raise HTTPException(status_code=404, detail=f"Ticket with id {id} not found")
+    if len(moved.rank) > get_app_settings().rank_rebalance_length:
+        background_tasks.add_task(rebalance_column, moved.kanban_status_id)
+    set_entity_validators(response, ticket_crud, moved)
+    return moved
 
 
 @router.delete("/{id}", status_code=204)
-async def delete_ticket(id: int, db: Session = Depends(get_db)):
-    ticket_crud = TicketCRUD(db)
-    ticket_crud.delete(id)
+async def delete_ticket(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    ticket_crud = AsyncTicketCRUD(db)
+    await check_if_match(request, ticket_crud, id)
+    if await coalesced(ticket_crud.delete, id) is None:
+        raise HTTPException(status_code=404, detail=f"Ticket with id {id} not found")
     return {"message": "Ticket deleted successfully"}
 
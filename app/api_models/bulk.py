@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
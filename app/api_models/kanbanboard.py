@@ -2,6 +2,10 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
+from app.api_models.kanbanstatus import KanbanStatusResponse
+from app.api_models.tickets import TicketResponse
+from app.api_models.validators import not_null
+
 
 class KanbanBoardBase(BaseModel):
     name: str
@@ -16,13 +20,29 @@ class KanbanBoardUpdate(KanbanBoardBase):
     pass
 
 
+class KanbanBoardPatch(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    
+    _not_null = not_null("name")
+
+
 class KanbanBoardInDB(KanbanBoardBase):
     id: int
     created_at: datetime
     
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class KanbanBoardResponse(KanbanBoardInDB):
     pass
+
+
+class KanbanColumn(KanbanStatusResponse):
+    ticket_count: int
+    tickets: List[TicketResponse]
+
+
+class KanbanBoardView(KanbanBoardResponse):
+    columns: List[KanbanColumn]
@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
+from app.api_models.validators import not_null
+
 
 class KanbanStatusBase(BaseModel):
     name: str
@@ -17,12 +19,24 @@ class KanbanStatusUpdate(KanbanStatusBase):
     pass
 
 
+class KanbanStatusPatch(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    board_id: Optional[int] = None
+    
+    _not_null = not_null("name", "board_id")
+
+
+class KanbanStatusBulkUpdate(KanbanStatusPatch):
+    id: int
+
+
 class KanbanStatusInDB(KanbanStatusBase):
     id: int
     created_at: datetime
     
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class KanbanStatusResponse(KanbanStatusInDB):
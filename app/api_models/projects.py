@@ -2,10 +2,25 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+from app.api_models.validators import not_null
+
 
 class ProjectCreate(BaseModel):
     name: str
+    description: str
+    kanban_board_id: int
+
+
+class ProjectPatch(BaseModel):
+    name: Optional[str] = None
     description: Optional[str] = None
+    kanban_board_id: Optional[int] = None
+    
+    _not_null = not_null("name", "description", "kanban_board_id")
+
+
+class ProjectBulkUpdate(ProjectPatch):
+    id: int
 
 
 class ProjectResponse(ProjectCreate):
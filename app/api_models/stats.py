@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+
+class TicketCountResponse(BaseModel):
+    project_id: int
+    kanban_status_id: int
+    priority: str
+    count: int
+
+
+class TicketStats(BaseModel):
+    total: int
+    by_project: Dict[int, int]
+    by_status: Dict[int, int]
+    by_priority: Dict[str, int]
+    counts: List[TicketCountResponse]
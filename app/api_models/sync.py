@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+from app.api_models.kanbanboard import KanbanBoardResponse
+from app.api_models.kanbanstatus import KanbanStatusResponse
+from app.api_models.projects import ProjectResponse
+from app.api_models.tickets import TicketResponse
+
+
+class DeletedRow(BaseModel):
+    table: str
+    id: int
+    deleted_at: datetime
+
+
+class SyncResponse(BaseModel):
+    token: str
+    kanban_boards: List[KanbanBoardResponse]
+    kanban_statuses: List[KanbanStatusResponse]
+    projects: List[ProjectResponse]
+    tickets: List[TicketResponse]
+    deleted: List[DeletedRow]
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+from app.api_models.validators import not_null
+
 
 class TicketCreate(BaseModel):
     project_id: int
@@ -9,11 +11,38 @@ class TicketCreate(BaseModel):
     description: str
     status: str
     priority: str
+    kanban_status_id: int
+
+
+class TicketPatch(BaseModel):
+    project_id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    kanban_status_id: Optional[int] = None
+    
+    _not_null = not_null("project_id", "title", "description", "status", "priority", "kanban_status_id")
+
+
+class TicketBulkUpdate(TicketPatch):
+    id: int
+
+
+class TicketMove(BaseModel):
+    kanban_status_id: int
+    after_id: Optional[int] = None
+    before_id: Optional[int] = None
 
 
 class TicketResponse(TicketCreate):
     id: int
+    rank: str
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TicketSearchResult(TicketResponse):
+    score: float
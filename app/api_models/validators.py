@@ -0,0 +1,10 @@
+from pydantic import field_validator
+
+
+def not_null(*fields: str):
+    """Reject an explicit null for fields that may be omitted but map to NOT NULL columns"""
+    def check(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+    return field_validator(*fields)(check)
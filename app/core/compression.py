@@ -0,0 +1,166 @@
+"""Brotli or gzip compression of JSON responses above a size threshold.
+
+Brotli is used when the client accepts it and the optional ``brotli`` package is
+installed, gzip otherwise. Complete bodies smaller than ``minimum_size`` are sent
+as is; streamed bodies (NDJSON) are compressed chunk by chunk and flushed after
+every chunk so lines reach the client as soon as they are produced.
+
+A compressed response is a representation of its own, so its encoding is appended
+to its ETag; the suffix is removed from If-None-Match and If-Match on the way in,
+and put back on the ETag of a 304 answering such a tag.
+"""
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson")
+ENCODINGS = ("br", "gzip")
+CONDITIONAL_HEADERS = (b"if-match", b"if-none-match")
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + (self._brotli.flush() if flush else b"")
+        return self._gzip.compress(data) + (self._gzip.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._gzip.flush(zlib.Z_FINISH)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    encodings = {item.split(";")[0].strip().lower() for item in accept_encoding.split(",")}
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+def _decoded_etags(header: str, originals: Dict[str, str]) -> str:
+    """``header`` with the encoding suffixes removed, recording the tags they were removed from"""
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        for encoding in ENCODINGS:
+            suffix = f'-{encoding}"'
+            if tag.endswith(suffix):
+                decoded = tag[:-len(suffix)] + '"'
+                originals[decoded] = tag
+                tag = decoded
+                break
+        tags.append(tag)
+    return ", ".join(tags)
+
+
+def _decode_conditional_headers(scope: Scope) -> Tuple[Scope, Dict[str, str]]:
+    originals: Dict[str, str] = {}
+    if not any(name in CONDITIONAL_HEADERS for name, _ in scope["headers"]):
+        return scope, originals
+    headers = [
+        (name, _decoded_etags(value.decode("latin-1"), originals).encode("latin-1") if name in CONDITIONAL_HEADERS else value)
+        for name, value in scope["headers"]
+    ]
+    return {**scope, "headers": headers}, originals
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON and NDJSON responses with brotli or gzip"""
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        scope, originals = _decode_conditional_headers(scope)
+        if originals:
+            send = self._restoring_etags(send, originals)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "").split(";")[0].strip()
+                passthrough = media_type not in COMPRESSIBLE_TYPES or "content-encoding" in headers
+                if passthrough:
+                    await send(message)
+                else:
+                    # Wait for the first body chunk to know whether the response is worth compressing
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                if not more_body:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(start)
+            chunk = compressor.compress(body, flush=True)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _restoring_etags(send: Send, originals: Dict[str, str]) -> Send:
+        """Answer a 304 with the encoded ETag the client sent, the one of the representation it has cached"""
+        async def send_restored(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 304:
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag")
+                if etag in originals:
+                    headers["ETag"] = originals[etag]
+            await send(message)
+        return send_restored
@@ -1,58 +1,142 @@
 from fastapi import FastAPI
 from loguru import logger
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv, find_dotenv
+from contextlib import contextmanager
+import asyncio
 import os
+import time
 
 from app.db_models.base import *
+from app.db_models.aggregates import reconcile_ticket_counts
+from app.db_models.archive import run_archiver
+from app.db_models.coalescer import write_coalescer
 from app.db_models.session import engine, SessionLocal
+from app.db_models.indexes import ensure_indexes
+from app.db_models.schema import DEFAULTS, SCHEMA, ensure_autoincrement, ensure_columns, fingerprint, record_fingerprint, schema_fingerprint, stored_fingerprint
+from app.db_models.search import ensure_search_index
+from app.db_models.seed import DEFAULT_STATUSES
 
-def create_default_statuses(db: Session) -> None:
+DEFAULT_BOARD_NAME = "Default Board"
+# Bookkeeping tables without a change counter
+UNVERSIONED_TABLES = (
+    TableVersion.__tablename__,
+    SchemaVersion.__tablename__,
+    Tombstone.__tablename__,
+    TicketCount.__tablename__,
+    # Archiving and restoring tickets bump the tickets counter
+    ArchivedTicket.__tablename__,
+)
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    yield
+    logger.info(f"Startup phase [{name}] took {(time.perf_counter() - started_at) * 1000:.1f}ms")
+
+def create_default_statuses(db: Session, board_id: int) -> None:
+    existing = {name for (name,) in db.query(KanbanStatus.name).filter(KanbanStatus.board_id == board_id)}
     statuses = [
-        KanbanStatus(name="Backlog", description="Backlog Status", board_id=1),
-        KanbanStatus(name="To Do", description="To Do Status", board_id=1),
-        KanbanStatus(name="In Progress", description="In Progress Status", board_id=1),
-        KanbanStatus(name="Done", description="Done Status", board_id=1)
+        KanbanStatus(name=name, description=f"{name} Status", board_id=board_id)
+        for name in DEFAULT_STATUSES
+        if name not in existing
     ]
     db.add_all(statuses)
     db.commit()
 
-def create_default_board(db: Session) -> None:
-    board = KanbanBoard(name="Default Board", description="Default Kanban Board")
-    db.add(board)
+def create_default_board(db: Session) -> KanbanBoard:
+    board = db.query(KanbanBoard).filter(KanbanBoard.name == DEFAULT_BOARD_NAME).order_by(KanbanBoard.id).first()
+    if board is None:
+        board = KanbanBoard(name=DEFAULT_BOARD_NAME, description="Default Kanban Board")
+        db.add(board)
+        db.commit()
+        db.refresh(board)
+    return board
+
+def create_table_versions(db: Session) -> None:
+    existing = {name for (name,) in db.query(TableVersion.table_name)}
+    missing = [
+        TableVersion(table_name=table.name, version=0)
+        for table in Base.metadata.sorted_tables
+        if table.name not in existing and table.name not in UNVERSIONED_TABLES
+    ]
+    db.add_all(missing)
     db.commit()
-    db.refresh(board)
 
-def create_kanban_defaults(db: Session, create_defaults: Optional[str] = True) -> None:
-    if create_defaults.lower() == 'true':
+def create_schema(db: Session) -> None:
+    # Create tables
+    Base.metadata.create_all(bind=engine)
+
+    # Add columns missing from tables created before they were declared
+    ensure_columns(engine)
+
+    # Rebuild tables created before their ids were declared AUTOINCREMENT
+    ensure_autoincrement(engine)
+
+    # Create indexes missing from databases created before they were declared
+    ensure_indexes(engine)
+
+    # Create the ticket full-text index and the triggers keeping it in sync
+    ensure_search_index(engine)
+
+    # Seed the change counters used for collection ETags
+    create_table_versions(db)
+
+    # Fill the ticket count summary, which may be new or stale after a schema change
+    drift = reconcile_ticket_counts(engine)
+    if drift:
+        logger.info(f"Reconciled ticket counts, {len(drift)} cells had drifted")
+
+def create_kanban_defaults(db: Session, create_defaults: Optional[str] = None) -> None:
+    if (create_defaults or "").lower() == 'true':
+        defaults = fingerprint([DEFAULT_BOARD_NAME, *DEFAULT_STATUSES])
+        if stored_fingerprint(engine, DEFAULTS) == defaults:
+            logger.info("Default Kanban Board and Statuses already created")
+            return
         logger.info("Creating default Kanban Board and Statuses")
         logger.info("To set off, add env variable CREATE_DEFAULTS=False")
-        create_default_board(db)
-        create_default_statuses(db)
-    elif create_defaults.lower() == 'false': logger.info("Create defaults is set to False, not creating default Kanban Board and Statuses")
+        board = create_default_board(db)
+        create_default_statuses(db, board.id)
+        record_fingerprint(db, DEFAULTS, defaults)
+    elif (create_defaults or "").lower() == 'false': logger.info("Create defaults is set to False, not creating default Kanban Board and Statuses")
     else: logger.info("No CREATE_DEFAULTS env variable set, not creating default Kanban Board and Statuses")
 
 
 def create_start_app_handler(app: FastAPI) -> Callable:
     async def start_app() -> None:
+        started_at = time.perf_counter()
         settings = app.state.settings
         logger.info(f"Starting [{settings.app_env.value}] Application")
         # Start up Events
         load_dotenv(find_dotenv())
-        
-        # Create tables
-        Base.metadata.create_all(bind=engine)
-        
+
+        # Compare the schema of the models with the one last applied to the database
+        with startup_phase("schema check"):
+            schema = schema_fingerprint(engine)
+            schema_applied = stored_fingerprint(engine, SCHEMA) == schema
+
         # Create a new session
         session = SessionLocal()
-        
+
+        # Run the DDL only when the models changed since it was last applied
+        if not schema_applied:
+            with startup_phase("schema apply"):
+                create_schema(session)
+                record_fingerprint(session, SCHEMA, schema)
+
         # Create default Kanban Board and Statuses
-        create_kanban_defaults(session, os.getenv('CREATE_DEFAULTS'))
-        
+        with startup_phase("defaults"):
+            create_kanban_defaults(session, os.getenv('CREATE_DEFAULTS'))
+
         # Close session
         session.close()
-        
+
+        # Move old closed tickets to the archive in the background
+        if settings.archive_enabled:
+            app.state.archiver = asyncio.create_task(run_archiver(settings))
+        logger.info(f"Started in {(time.perf_counter() - started_at) * 1000:.1f}ms")
+
     return start_app
 
 def create_stop_app_handler(app: FastAPI) -> Callable:
@@ -61,4 +145,10 @@ def create_stop_app_handler(app: FastAPI) -> Callable:
         settings = app.state.settings
         logger.info(f"Stopping [{settings.app_env.value}] application")
         # Shut down events
+        archiver = getattr(app.state, "archiver", None)
+        if archiver is not None:
+            archiver.cancel()
+        if write_coalescer is not None:
+            # Commit the writes still queued
+            await write_coalescer.close()
     return stop_app
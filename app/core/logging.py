@@ -1,10 +1,22 @@
+import atexit
+import json
 import logging
+import queue
+import random
+import threading
+import traceback
+from dataclasses import asdict, dataclass
 from types import FrameType
-from typing import cast
+from typing import Any, Dict, List, Optional, TextIO, cast
 
 from loguru import logger
 
 class InterceptHandler(logging.Handler):
+    def __init__(self, level: int = logging.NOTSET, find_caller: bool = True):
+        super().__init__(level)
+        # Walking the frames for the caller costs more than the rest of the record, skip it when throughput matters
+        self.find_caller = find_caller
+
     def emit(self, record: logging.LogRecord) -> None:
         # Get corresponding Loguru level if it exists
         try:
@@ -12,10 +24,124 @@ class InterceptHandler(logging.Handler):
         except ValueError:
             level = record.levelno
 
+        if not self.find_caller:
+            # Take the location the logging module already recorded instead
+            location = {"name": record.name, "function": record.funcName, "line": record.lineno}
+            logger.patch(lambda loguru_record: loguru_record.update(location)).opt(exception=record.exc_info).log(
+                level, record.getMessage()
+            )
+            return
+
         # Find caller from where originated the logged message
         frame, depth = logging.currentframe(), 2
         while frame.f_code.co_filename == logging.__file__:
             frame = cast(FrameType, frame.f_back)
             depth += 1
 
-        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
\ No newline at end of file
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a ``rate`` fraction of the records below WARNING, e.g. access logs"""
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or random.random() < self.rate:
+            return True
+        log_stats.sampled_out += 1
+        return False
+
+
+@dataclass
+class LogStats:
+    written: int = 0
+    dropped: int = 0
+    sampled_out: int = 0
+
+
+log_stats = LogStats()
+
+
+def json_line(record: Dict[str, Any]) -> str:
+    """One JSON document per record, from a loguru record"""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    if record["extra"]:
+        payload["extra"] = record["extra"]
+    if record["exception"] is not None:
+        payload["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    return json.dumps(payload, default=str)
+
+
+class JSONSink:
+    """Synchronous loguru sink writing one JSON document per line"""
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, message) -> None:
+        self.stream.write(json_line(message.record) + "\n")
+        log_stats.written += 1
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class QueueSink:
+    """Loguru sink handing records to a writer thread through a bounded queue.
+
+    The logging call only enqueues the record; formatting (as JSON when ``json``)
+    and I/O happen on the writer thread. When the queue is full, records are
+    dropped and counted instead of blocking the caller.
+    """
+    def __init__(self, stream: TextIO, json: bool = False, maxsize: int = 10000, batch_size: int = 256):
+        self.stream = stream
+        self.json = json
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[Any]]" = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, message) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            log_stats.dropped += 1
+
+    def _format(self, message) -> str:
+        return json_line(message.record) + "\n" if self.json else str(message)
+
+    def _run(self) -> None:
+        while True:
+            messages: List[Any] = [self._queue.get()]
+            while len(messages) < self.batch_size:
+                try:
+                    messages.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in messages
+            lines = [self._format(message) for message in messages if message is not None]
+            if lines:
+                self.stream.write("".join(lines))
+                self.stream.flush()
+                log_stats.written += len(lines)
+            if stop:
+                return
+
+    def stop(self) -> None:
+        """Write the queued records and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+def logging_stats() -> Dict[str, int]:
+    return asdict(log_stats)
@@ -0,0 +1,176 @@
+"""In-process request and database metrics, rendered in the Prometheus text format.
+
+``MetricsMiddleware`` times every request and reports it per route template, and
+``instrument_engine`` counts the SQL statements and database time of the request
+running in the current context. Both are exposed at ``/metrics`` and summarized in
+a ``Server-Timing`` response header.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(label_names)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self, kind: str = "counter") -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {kind}"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def render(self, kind: str = "gauge") -> List[str]:
+        return super().render(kind)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name, self.help, self.label_names = name, help, tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        counts, total = self.values.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total[0]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Request latency by route", ("method", "route"), LATENCY_BUCKETS
+        )
+        self.requests = Counter("http_requests_total", "Requests by route and status code", ("method", "route", "status"))
+        self.in_flight = Gauge("http_requests_in_flight", "Requests currently being served")
+        self.db_statements = Histogram(
+            "db_statements_per_request", "SQL statements executed per request", ("method", "route"), STATEMENT_BUCKETS
+        )
+        self.db_duration = Counter("db_duration_seconds_total", "Time spent in SQL statements by route", ("method", "route"))
+        self.write_batch_size = Histogram("db_write_batch_size", "Writes committed per coalesced batch", (), BATCH_BUCKETS)
+        self.write_queue_seconds = Histogram(
+            "db_write_queue_seconds", "Time from queueing a coalesced write to its commit", (), LATENCY_BUCKETS
+        )
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = [self.request_duration, self.requests, self.in_flight, self.db_statements, self.db_duration,
+                       self.write_batch_size, self.write_queue_seconds]
+            lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@dataclass
+class RequestStats:
+    started_at: float
+    db_statements: int = 0
+    db_seconds: float = 0.0
+
+    def server_timing(self) -> str:
+        app_ms = (time.perf_counter() - self.started_at) * 1000
+        db_ms = self.db_seconds * 1000
+        return f'db;dur={db_ms:.2f};desc="{self.db_statements} statements", app;dur={app_ms:.2f}'
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements and database time of the current request"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        stats = request_stats.get()
+        if stats is not None:
+            stats.db_statements += 1
+            stats.db_seconds += time.perf_counter() - context._metrics_started_at
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status codes and SQL usage per route template"""
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(started_at=time.perf_counter())
+        token = request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with registry.lock:
+            registry.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            with registry.lock:
+                registry.in_flight.dec()
+                registry.request_duration.observe(labels, time.perf_counter() - stats.started_at)
+                registry.requests.inc(labels + (str(status_code),))
+                registry.db_statements.observe(labels, stats.db_statements)
+                registry.db_duration.inc(labels, stats.db_seconds)
@@ -1,10 +1,32 @@
 import logging
 import sys
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson  # noqa: F401 - required by ORJSONResponse, which only imports it when rendering
+from fastapi.responses import JSONResponse, ORJSONResponse
 from loguru import logger
 
-from app.core.settings.base import BaseAppSettings
-from app.core.logging import InterceptHandler
+from app.core.settings.base import BaseAppSettings, ResponseClass, SQLiteProfile
+from app.core.logging import InterceptHandler, JSONSink, QueueSink, SamplingFilter
+
+# PRAGMAs applied to every new SQLite connection, per profile
+SQLITE_PRAGMAS: Dict[SQLiteProfile, Dict[str, Any]] = {
+    SQLiteProfile.default: {},
+    SQLiteProfile.durable: {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    SQLiteProfile.performance: {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    },
+}
+
 
 class AppSettings(BaseAppSettings):
     debug: bool = False
@@ -13,6 +35,7 @@ class AppSettings(BaseAppSettings):
     redoc_url: str = "/redoc"
     title: str = "Alfred AI - FastAPI Application"
     version: str = "0.0.0"
+    response_class: ResponseClass = ResponseClass.orjson
     
     api_prefix: str = "/api"
     
@@ -20,6 +43,50 @@ class AppSettings(BaseAppSettings):
     
     logging_level: int = logging.INFO
     loggers: Tuple[str, str] = ("uvicorn.asgi", "uvicorn.access")
+    # Write logs from a background thread through a bounded queue, dropping records when it is full
+    log_async: bool = False
+    log_queue_size: int = 10000
+    log_json: bool = False
+    # Fraction of access log records below WARNING that are kept
+    access_log_sample_rate: float = 1.0
+    
+    database_url: Optional[str] = None
+    # Replica serving the read-only sessions, read-only connections to database_url when unset
+    database_read_url: Optional[str] = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 3600
+    sqlite_profile: SQLiteProfile = SQLiteProfile.performance
+    # Commit concurrent single-row writes together, in batches of up to this many or after this delay
+    write_coalescing: bool = False
+    write_batch_size: int = 64
+    write_batch_delay_ms: float = 2.0
+    
+    entity_cache_tables: Tuple[str, ...] = ("kanban_boards", "kanban_statuses")
+    entity_cache_size: int = 1024
+    entity_cache_ttl: float = 60.0
+    entity_cache_shared_backend: Optional[str] = None
+    
+    metrics_enabled: bool = True
+    
+    # Committed changes kept for Last-Event-ID resume, and events queued per board subscriber
+    change_feed_buffer_size: int = 1024
+    change_feed_queue_size: int = 256
+    change_feed_keepalive: float = 15.0
+    
+    # Ticket ranks longer than this trigger a background rebalance of their column
+    rank_rebalance_length: int = 16
+    
+    # Tickets in archive_statuses not updated for archive_after_days move to archived_tickets,
+    # in batches of archive_batch_size every archive_interval seconds
+    archive_enabled: bool = False
+    archive_statuses: Tuple[str, ...] = ("closed",)
+    archive_after_days: float = 90.0
+    archive_batch_size: int = 500
+    archive_interval: float = 3600.0
+    
+    # JSON responses at least this many bytes are compressed, 0 disables compression
+    compression_minimum_size: int = 1024
     
     class Config:
         validate_assignment = True
@@ -32,14 +99,45 @@ class AppSettings(BaseAppSettings):
             "openapi_url": self.openapi_url,
             "redoc_url": self.redoc_url,
             "title": self.title,
-            "version": self.version
+            "version": self.version,
+            "default_response_class": self.default_response_class,
         }
     
+    @property
+    def default_response_class(self) -> type:
+        if self.response_class == ResponseClass.orjson:
+            return ORJSONResponse
+        return JSONResponse
+    
+    @property
+    def db_pool_kwargs(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_recycle": self.db_pool_recycle,
+        }
+    
+    @property
+    def sqlite_pragmas(self) -> Dict[str, Any]:
+        return SQLITE_PRAGMAS[self.sqlite_profile]
+    
     def configure_logging(self) -> None:
-        logging.getLogger().handlers = [InterceptHandler()]
+        find_caller = not self.log_async
+        logging.getLogger().handlers = [InterceptHandler(find_caller=find_caller)]
         for logger_name in self.loggers:
             logging_logger = logging.getLogger(logger_name)
-            logging_logger.handlers = [InterceptHandler(level=self.logging_level)]
+            logging_logger.handlers = [InterceptHandler(level=self.logging_level, find_caller=find_caller)]
+        access_logger = logging.getLogger("uvicorn.access")
+        access_logger.filters = [SamplingFilter(self.access_log_sample_rate)] if self.access_log_sample_rate < 1 else []
 
-        logger.configure(handlers=[{"sink": sys.stderr, "level": self.logging_level}])
+        if self.log_async:
+            handler = {"sink": QueueSink(sys.stderr, json=self.log_json, maxsize=self.log_queue_size), "colorize": False}
+        elif self.log_json:
+            handler = {"sink": JSONSink(sys.stderr)}
+        else:
+            handler = {"sink": sys.stderr}
+        if self.log_json:
+            # Records are rendered from their fields, skip formatting the text line
+            handler["format"] = "{message}"
+        logger.configure(handlers=[{**handler, "level": self.logging_level}])
             
\ No newline at end of file
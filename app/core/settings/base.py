@@ -6,6 +6,15 @@ class AppEnvTypes(Enum):
     prod: str = "prod"
     dev: str = "dev"
 
+class SQLiteProfile(Enum):
+    default: str = "default"
+    durable: str = "durable"
+    performance: str = "performance"
+
+class ResponseClass(Enum):
+    json: str = "json"
+    orjson: str = "orjson"
+
 class BaseAppSettings(BaseSettings):
     app_env: AppEnvTypes = AppEnvTypes.dev
     
@@ -1,5 +1,10 @@
 from app.core.settings.app import AppSettings
+from app.core.settings.base import SQLiteProfile
 
 class ProdAppSettings(AppSettings):
+    sqlite_profile: SQLiteProfile = SQLiteProfile.durable
+    log_async: bool = True
+    log_json: bool = True
+    
     class Config(AppSettings.Config):
         env_file = "prod.env"
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Ticket counts per project, kanban status and priority.
+
+``ticket_counts`` is updated by the CRUD layer in the transaction of every ticket
+write, so dashboards read a handful of summary rows instead of counting tickets.
+Archived tickets stay counted, archiving and restoring leave the table alone.
+``reconcile_ticket_counts`` recomputes the table from ``tickets`` and reports the
+cells that had drifted, e.g. after writes that bypassed the CRUD layer. Run
+``python -m app.db_models.aggregates`` to reconcile the configured database.
+"""
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from loguru import logger
+from sqlalchemy import Insert, Select, delete, func, insert, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from app.db_models.base import ArchivedTicket, Ticket, TicketCount
+
+
+COUNT_KEYS = ("project_id", "kanban_status_id", "priority")
+
+
+@dataclass
+class Drift:
+    project_id: int
+    kanban_status_id: int
+    priority: str
+    stored: int
+    actual: int
+
+
+def count_tickets() -> Select:
+    tickets = union_all(
+        *(select(*(model.__table__.c[key] for key in COUNT_KEYS)) for model in (Ticket, ArchivedTicket))
+    ).subquery()
+    keys = [tickets.c[key] for key in COUNT_KEYS]
+    return select(*keys, func.count()).group_by(*keys)
+
+
+def increment_counts(dialect_name: str) -> Insert:
+    """Upsert adding ``count`` to the row of each key, executed with one parameter set per key"""
+    upsert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = upsert(TicketCount)
+    return statement.on_conflict_do_update(
+        index_elements=list(COUNT_KEYS),
+        set_={"count": TicketCount.count + statement.excluded.count},
+    )
+
+
+def count_deltas(removed: List[dict], added: List[dict]) -> List[dict]:
+    """Parameters of ``increment_counts`` for tickets leaving and entering their keys"""
+    deltas: Dict[Tuple, int] = {}
+    for rows, sign in ((removed, -1), (added, 1)):
+        for row in rows:
+            key = tuple(row[name] for name in COUNT_KEYS)
+            deltas[key] = deltas.get(key, 0) + sign
+    return [{**dict(zip(COUNT_KEYS, key)), "count": delta} for key, delta in deltas.items() if delta]
+
+
+def reconcile_ticket_counts(engine: Engine) -> List[Drift]:
+    """Rebuild ``ticket_counts`` from ``tickets`` and ``archived_tickets`` in one transaction, returns the cells that were wrong"""
+    table = TicketCount.__table__
+    with engine.begin() as conn:
+        # Deleting first takes the write lock, so no ticket write lands between the two counts
+        stored = {tuple(row[:3]): row[3] for row in conn.execute(delete(table).returning(*table.c)) if row[3]}
+        conn.execute(insert(table).from_select([*COUNT_KEYS, "count"], count_tickets()))
+        actual = {tuple(row[:3]): row[3] for row in conn.execute(select(*table.c))}
+    return [
+        Drift(*key, stored=stored.get(key, 0), actual=actual.get(key, 0))
+        for key in sorted(stored.keys() | actual.keys(), key=str)
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+
+if __name__ == "__main__":
+    from app.db_models.base import Base
+    from app.db_models.session import engine
+
+    Base.metadata.create_all(bind=engine)
+    drift = reconcile_ticket_counts(engine)
+    for cell in drift:
+        logger.warning(f"Ticket count drift: {cell}")
+    logger.info(f"Reconciled ticket counts, {len(drift)} cells had drifted")
+    sys.exit(1 if drift else 0)
@@ -0,0 +1,57 @@
+"""Archiving of old closed tickets, keeping the hot ``tickets`` table small.
+
+Tickets in one of the ``archive_statuses`` that were not updated for
+``archive_after_days`` move to ``archived_tickets`` in batches of
+``archive_batch_size``, one transaction per batch, so writers get the lock
+between batches. Archived tickets leave the search index, delta sync and the
+board change feed, and stay counted in ``ticket_counts``. Reads include them with
+``include_archived``, and updating or deleting an archived ticket restores it
+first. With ``archive_enabled`` the application archives every
+``archive_interval`` seconds. Run ``python -m app.db_models.archive`` to archive
+the configured database once.
+"""
+import asyncio
+import datetime
+
+from loguru import logger
+
+from app.core.settings.app import AppSettings
+from app.db_models.async_crud import AsyncTicketCRUD
+from app.db_models.session import AsyncSessionLocal
+
+
+def archive_cutoff(settings: AppSettings) -> datetime.datetime:
+    return datetime.datetime.utcnow() - datetime.timedelta(days=settings.archive_after_days)
+
+
+async def archive_tickets(settings: AppSettings) -> int:
+    """Archive every eligible ticket batch by batch, returns how many were archived"""
+    before = archive_cutoff(settings)
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            archived = await AsyncTicketCRUD(db).archive(settings.archive_statuses, before, settings.archive_batch_size)
+        total += archived
+        if archived < settings.archive_batch_size:
+            return total
+        # Let queued requests in before the next batch
+        await asyncio.sleep(0)
+
+
+async def run_archiver(settings: AppSettings) -> None:
+    """Archive tickets every ``archive_interval`` seconds until cancelled"""
+    while True:
+        try:
+            archived = await archive_tickets(settings)
+            if archived:
+                logger.info(f"Archived {archived} tickets")
+        except Exception:
+            logger.exception("Archiving tickets failed")
+        await asyncio.sleep(settings.archive_interval)
+
+
+if __name__ == "__main__":
+    from app.core.config import get_app_settings
+
+    total = asyncio.run(archive_tickets(get_app_settings()))
+    logger.info(f"Archived {total} tickets")
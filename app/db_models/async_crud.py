@@ -0,0 +1,546 @@
+from functools import partial
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+from app.db_models.base import *
+from app.db_models.crud import (
+    SYNC_MODELS,
+    BoardViewStatements,
+    ChangeFeedMixin,
+    CRUDStatements,
+    DeltaStatements,
+    EntityCacheMixin,
+    TicketCountMixin,
+    TicketArchiveStatements,
+    TicketRankStatements,
+    TicketStatsStatements,
+    column_values,
+)
+from app.db_models.aggregates import increment_counts
+from app.db_models.coalescer import WRITE_BATCH
+from app.db_models.session import SQLITE_BEGIN
+from app.db_models.ranking import rank_between, spaced_ranks
+from app.db_models.search import search_tickets
+
+
+# Key in ``AsyncSession.info`` of the post-commit steps of the open transaction
+AFTER_COMMIT = "after_commit"
+
+
+class AsyncBaseCRUD(CRUDStatements, EntityCacheMixin, ChangeFeedMixin, TicketCountMixin):
+    """Base CRUD class for all models, on an AsyncSession"""
+    def __init__(self, db: AsyncSession, model=None):
+        self.db = db
+        self.model = model
+
+    async def create(self, **kwargs):
+        """Insert a row with one INSERT ... RETURNING and return it"""
+        await self.begin_write()
+        try:
+            version = await self.db.scalar(self._bump_version())
+            item = (await self.db.execute(self._insert_returning({**kwargs, "change_version": version}))).first()
+            await self._update_counts([], [kwargs])
+            await self._changed("created", [item._asdict()])
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return item
+
+    async def get(self, id: int):
+        item = self._cached(id)
+        if item is None:
+            item = await self.db.get(self.model, id)
+            self._cache_store(item)
+        return item
+
+    async def get_all(self):
+        return (await self.db.scalars(select(self.model))).all()
+
+    async def get_updated_at(self, id: int) -> Optional[datetime.datetime]:
+        """Last modification time of a row, None when it does not exist.
+
+        Always read from the database: the entity cache of this worker can miss writes of
+        other workers until its entries expire, and validators must not pass a stale If-Match.
+        A cached row older than the database one is dropped, so the body matches the validators.
+        """
+        updated_at = (await self.db.scalars(self._updated_at(id))).first()
+        cached = self._cached(id)
+        if cached is not None and cached.updated_at != updated_at:
+            self._cache_invalidate([id])
+        return updated_at
+
+    async def get_table_version(self) -> Optional[int]:
+        return (await self.db.scalars(self._table_version())).first()
+
+    async def get_page(self, limit: int, after_id: Optional[int] = None, **filters):
+        """Keyset page ordered by id, returns the items and whether more rows follow"""
+        items = (await self.db.scalars(self._filtered_select(after_id, **filters).limit(limit + 1))).all()
+        return items[:limit], len(items) > limit
+
+    async def get_page_rows(self, limit: int, after_id: Optional[int] = None, **filters):
+        """``get_page`` as column rows, skipping ORM object construction for read-only listings"""
+        rows = (await self.db.execute(self._filtered_rows(after_id, **filters).limit(limit + 1))).all()
+        return rows[:limit], len(rows) > limit
+
+    async def stream(self, batch_size: int = 1000, after_id: Optional[int] = None, **filters) -> AsyncIterator:
+        """Iterate over every matching row, fetching ``batch_size`` rows at a time"""
+        statement = self._filtered_select(after_id, **filters).execution_options(yield_per=batch_size)
+        async for item in await self.db.stream_scalars(statement):
+            yield item
+
+    async def stream_rows(self, batch_size: int = 1000, after_id: Optional[int] = None, **filters) -> AsyncIterator[list]:
+        """``stream`` as chunks of up to ``batch_size`` column rows, one chunk per fetch"""
+        statement = self._filtered_rows(after_id, **filters).execution_options(yield_per=batch_size)
+        async for rows in (await self.db.stream(statement)).partitions():
+            yield rows
+
+    async def update(self, id: int, **kwargs):
+        return await self.patch(id, **kwargs)
+
+    async def patch(self, id: int, **changes):
+        """Write only ``changes`` with one UPDATE ... RETURNING, returns the row or None when ``id`` does not exist"""
+        await self.begin_write()
+        try:
+            version = await self.db.scalar(self._bump_version())
+            counted = self._counted_rows([id], changes)
+            before = (await self.db.execute(counted)).all() if counted is not None else []
+            item = (await self.db.execute(self._update_returning(id, {**changes, "change_version": version}))).first()
+            if item is None:
+                await self._rollback()
+            else:
+                await self._update_counts(*self._updated_counts(before, [{**changes, "id": id}]))
+                await self._changed("updated", [item._asdict()], [id])
+                await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return item
+
+    async def delete(self, id: int) -> Optional[int]:
+        """Delete with one DELETE ... RETURNING, returns the id or None when it does not exist"""
+        await self.begin_write()
+        try:
+            version = await self.db.scalar(self._bump_version())
+            deleted = (await self.db.execute(self._delete_returning(id))).first()
+            if deleted is None:
+                await self._rollback()
+                return None
+            await self.db.execute(self._tombstones([id], version))
+            await self._update_counts([deleted._asdict()], [])
+            await self._changed("deleted", [deleted._asdict()], [id])
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return deleted.id
+
+    async def bulk_create(self, items: List[dict]) -> list:
+        """Insert all items with one executemany INSERT ... RETURNING, returns the rows in input order"""
+        if not items:
+            return []
+        await self.begin_write()
+        try:
+            version = await self.db.scalar(self._bump_version())
+            rows = (await self.db.execute(self._bulk_insert(), [{**item, "change_version": version} for item in items])).all()
+            await self._update_counts([], [row._asdict() for row in rows])
+            await self._changed("created", [row._asdict() for row in rows])
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return rows
+
+    async def bulk_update(self, items: List[dict]) -> Set[int]:
+        """Update items keyed by their ``id`` in one transaction, returns the ids that existed"""
+        await self.begin_write()
+        try:
+            ids = [item["id"] for item in items]
+            existing = set(await self.db.scalars(self._existing_ids(ids)))
+            found = [item for item in items if item["id"] in existing]
+            if found:
+                version = await self.db.scalar(self._bump_version())
+                counted = self._counted_rows(existing, {key for item in found for key in item})
+                before = (await self.db.execute(counted)).all() if counted is not None else []
+                await self.db.execute(update(self.model), [{**item, "change_version": version} for item in found])
+                await self._update_counts(*self._updated_counts(before, found))
+                rows = (await self.db.execute(self._rows_by_id(existing))).all()
+                await self._changed("updated", [row._asdict() for row in rows], existing)
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return existing
+
+    async def bulk_delete(self, ids: Iterable[int]) -> Set[int]:
+        """Delete all ids with one DELETE ... RETURNING, returns the ids that were deleted"""
+        await self.begin_write()
+        try:
+            version = await self.db.scalar(self._bump_version())
+            rows = (await self.db.execute(self._bulk_delete(ids))).all()
+            if rows:
+                await self.db.execute(self._tombstones([row.id for row in rows], version))
+            await self._update_counts([row._asdict() for row in rows], [])
+            await self._changed("deleted", [row._asdict() for row in rows], {row.id for row in rows})
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return {row.id for row in rows}
+
+    async def begin_write(self) -> None:
+        """Start the transaction of a write with the SQLite write lock taken, unless the session is in one already"""
+        if not self.db.in_transaction():
+            await self.db.connection(execution_options={SQLITE_BEGIN: "IMMEDIATE"})
+
+    async def _commit(self) -> None:
+        """Commit and run the post-commit steps, or keep the work of the current write when it runs in a coalesced batch"""
+        batch = self.db.info.get(WRITE_BATCH)
+        if batch is not None:
+            await batch.release()
+            return
+        await self.db.commit()
+        for step in self.db.info.pop(AFTER_COMMIT, []):
+            step()
+
+    async def _rollback(self) -> None:
+        batch = self.db.info.get(WRITE_BATCH)
+        if batch is not None:
+            await batch.rollback()
+            return
+        self.db.info.pop(AFTER_COMMIT, None)
+        await self.db.rollback()
+
+    async def _changed(self, op: str, rows: List[dict], ids: Iterable[int] = ()) -> None:
+        """Invalidate the written rows and publish them once the write commits, with its batch when it is coalesced.
+
+        Runs before the commit, the boards of the rows are read in the transaction of the write.
+        """
+        boards, statement = self._status_boards(rows)
+        if statement is not None:
+            boards.update((await self.db.execute(statement)).all())
+        step = partial(self._committed, op, rows, ids, boards)
+        batch = self.db.info.get(WRITE_BATCH)
+        (self.db.info.setdefault(AFTER_COMMIT, []) if batch is None else batch.pending).append(step)
+
+    def _committed(self, op: str, rows: List[dict], ids: Iterable[int], boards: Dict[int, int]) -> None:
+        self._cache_invalidate(ids)
+        self._publish(op, rows, boards)
+
+    async def _update_counts(self, removed: List[dict], added: List[dict]) -> None:
+        deltas = self._count_deltas(removed, added)
+        if deltas:
+            await self.db.execute(increment_counts(self.db.get_bind().dialect.name), deltas)
+
+
+class AsyncProjectCRUD(TicketStatsStatements, AsyncBaseCRUD):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Project)
+
+    async def create(self, name: str, description: str, kanban_board_id: int):
+        return await super().create(name=name, description=description, kanban_board_id=kanban_board_id)
+
+    async def get(self, id: int):
+        return await super().get(id)
+
+    async def get_page(self, limit: int, after_id: Optional[int] = None, kanban_board_id: Optional[int] = None):
+        return await super().get_page(limit, after_id, kanban_board_id=kanban_board_id)
+
+    async def get_page_rows(self, limit: int, after_id: Optional[int] = None, kanban_board_id: Optional[int] = None):
+        return await super().get_page_rows(limit, after_id, kanban_board_id=kanban_board_id)
+
+    def stream(self, batch_size: int = 1000, after_id: Optional[int] = None, kanban_board_id: Optional[int] = None):
+        return super().stream(batch_size, after_id, kanban_board_id=kanban_board_id)
+
+    def stream_rows(self, batch_size: int = 1000, after_id: Optional[int] = None, kanban_board_id: Optional[int] = None):
+        return super().stream_rows(batch_size, after_id, kanban_board_id=kanban_board_id)
+
+    async def get_all(self):
+        return await super().get_all()
+
+    async def get_stats(self, id: int) -> Optional[dict]:
+        """Ticket counts of a project by kanban status and priority, from the summary table"""
+        if await self.get(id) is None:
+            return None
+        return self._assemble_stats((await self.db.execute(self._project_counts(id))).all())
+
+    async def update(self, id: int, name: str, description: str, kanban_board_id: int):
+        return await super().update(id, name=name, description=description, kanban_board_id=kanban_board_id)
+
+    async def delete(self, id: int):
+        return await super().delete(id)
+
+
+class AsyncTicketCRUD(TicketRankStatements, TicketArchiveStatements, AsyncBaseCRUD):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Ticket)
+
+    async def create(self, project_id: int, title: str, description: str, status: str, priority: str, kanban_status_id: int):
+        await self.begin_write()
+        rank = rank_between(await self.db.scalar(self._last_rank(kanban_status_id)), None)
+        return await super().create(project_id=project_id, title=title, description=description, status=status,
+                                    priority=priority, kanban_status_id=kanban_status_id, rank=rank)
+
+    async def bulk_create(self, items: List[dict]) -> list:
+        await self.begin_write()
+        last_ranks = {status_id: await self.db.scalar(self._last_rank(status_id)) for status_id in {item["kanban_status_id"] for item in items}}
+        return await super().bulk_create(self._ranked(items, last_ranks))
+
+    async def _ranked_moves(self, items: List[dict]) -> List[dict]:
+        """Items moving a ticket to another column without a ``rank``, given one at the end of that column like ``move``"""
+        moves = [item for item in items if "kanban_status_id" in item and "rank" not in item]
+        if not moves:
+            return items
+        columns = dict((await self.db.execute(self._columns_by_id({item["id"] for item in moves}))).all())
+        moves = [item for item in moves if item["id"] in columns and columns[item["id"]] != item["kanban_status_id"]]
+        last_ranks = {status_id: await self.db.scalar(self._last_rank(status_id)) for status_id in {item["kanban_status_id"] for item in moves}}
+        ranked = {item["id"]: item for item in self._ranked(moves, last_ranks)}
+        return [ranked.get(item["id"], item) for item in items]
+
+    async def _neighbour_ranks(self, id: int, kanban_status_id: int, after_id: Optional[int], before_id: Optional[int]):
+        after = (await self.db.execute(self._anchor(after_id))).first() if after_id is not None else None
+        before = (await self.db.execute(self._anchor(before_id))).first() if before_id is not None else None
+        self._check_anchors(id, kanban_status_id, after_id, after, before_id, before)
+        if after is not None and before is not None:
+            return after.rank, before.rank
+        if after is not None:
+            return after.rank, await self.db.scalar(self._adjacent_rank(after, True, id))
+        if before is not None:
+            return await self.db.scalar(self._adjacent_rank(before, False, id)), before.rank
+        return await self.db.scalar(self._last_rank(kanban_status_id, id)), None
+
+    async def move(self, id: int, kanban_status_id: int, after_id: Optional[int] = None, before_id: Optional[int] = None):
+        """Put a ticket in a column after ``after_id`` and/or before ``before_id`` (last without either), writing only its row"""
+        await self.begin_write()
+        lower, upper = await self._neighbour_ranks(id, kanban_status_id, after_id, before_id)
+        if not self._has_room(lower, upper):
+            await self.rebalance(kanban_status_id)
+            await self.begin_write()
+            lower, upper = await self._neighbour_ranks(id, kanban_status_id, after_id, before_id)
+        return await self.patch(id, kanban_status_id=kanban_status_id, rank=rank_between(lower, upper))
+
+    async def rebalance(self, kanban_status_id: int) -> int:
+        """Rewrite the ranks of a column, in its current order, to short evenly spaced ones in one transaction"""
+        await self.begin_write()
+        try:
+            ids = (await self.db.scalars(self._column_ids(kanban_status_id))).all()
+            if not ids:
+                await self._rollback()
+                return 0
+            version = await self.db.scalar(self._bump_version())
+            ranks = spaced_ranks(len(ids))
+            await self.db.execute(update(Ticket), [{"id": id, "rank": rank, "change_version": version} for id, rank in zip(ids, ranks)])
+            rows = (await self.db.execute(self._filtered_rows(kanban_status_id=kanban_status_id))).all()
+            await self._changed("updated", [row._asdict() for row in rows], ids)
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return len(ids)
+
+    async def archive(self, statuses: Iterable[str], before: datetime.datetime, limit: int) -> int:
+        """Move up to ``limit`` tickets in ``statuses`` last updated before ``before`` to the archive in one transaction.
+
+        Archived tickets leave delta sync and the change feed like deleted ones, and stay in ``ticket_counts``.
+        """
+        await self.begin_write()
+        try:
+            version = await self.db.scalar(self._bump_version())
+            rows = (await self.db.execute(self._archive_delete(statuses, before, limit))).all()
+            if not rows:
+                await self._rollback()
+                return 0
+            await self.db.execute(self._archive_insert(), [row._asdict() for row in rows])
+            await self.db.execute(self._tombstones([row.id for row in rows], version))
+            await self._changed("archived", [row._asdict() for row in rows], [row.id for row in rows])
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return len(rows)
+
+    async def restore(self, id: int) -> bool:
+        """Move an archived ticket back to the end of its column, returns False when it is not archived"""
+        await self.begin_write()
+        try:
+            version = await self.db.scalar(self._bump_version())
+            row = (await self.db.execute(self._unarchive(id))).first()
+            if row is None:
+                await self._rollback()
+                return False
+            rank = rank_between(await self.db.scalar(self._last_rank(row.kanban_status_id)), None)
+            values = {**row._asdict(), "rank": rank, "change_version": version}
+            await self.db.execute(self._restore_insert(values))
+            await self.db.execute(self._restored_tombstones(id))
+            await self._changed("restored", [values])
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+        return True
+
+    async def get(self, id: int, include_archived: bool = False):
+        item = await super().get(id)
+        if item is None and include_archived:
+            item = await self.db.get(ArchivedTicket, id)
+        return item
+
+    async def get_all(self):
+        return await super().get_all()
+
+    async def get_page(self, limit: int, after_id: Optional[int] = None, project_id: Optional[int] = None,
+                       kanban_status_id: Optional[int] = None, status: Optional[str] = None, priority: Optional[str] = None,
+                       include_archived: bool = False):
+        return await super().get_page(limit, after_id, project_id=project_id, kanban_status_id=kanban_status_id,
+                                      status=status, priority=priority, include_archived=include_archived)
+
+    async def get_page_rows(self, limit: int, after_id: Optional[int] = None, project_id: Optional[int] = None,
+                            kanban_status_id: Optional[int] = None, status: Optional[str] = None, priority: Optional[str] = None,
+                            include_archived: bool = False):
+        return await super().get_page_rows(limit, after_id, project_id=project_id, kanban_status_id=kanban_status_id,
+                                           status=status, priority=priority, include_archived=include_archived)
+
+    def stream(self, batch_size: int = 1000, after_id: Optional[int] = None, project_id: Optional[int] = None,
+               kanban_status_id: Optional[int] = None, status: Optional[str] = None, priority: Optional[str] = None,
+               include_archived: bool = False):
+        return super().stream(batch_size, after_id, project_id=project_id, kanban_status_id=kanban_status_id,
+                              status=status, priority=priority, include_archived=include_archived)
+
+    def stream_rows(self, batch_size: int = 1000, after_id: Optional[int] = None, project_id: Optional[int] = None,
+                    kanban_status_id: Optional[int] = None, status: Optional[str] = None, priority: Optional[str] = None,
+                    include_archived: bool = False):
+        return super().stream_rows(batch_size, after_id, project_id=project_id, kanban_status_id=kanban_status_id,
+                                   status=status, priority=priority, include_archived=include_archived)
+
+    async def search(self, query: str, limit: int, offset: int = 0) -> List[dict]:
+        """Full-text search over titles and descriptions, ranked by bm25"""
+        if not query.split():
+            return []
+        rows = (await self.db.execute(search_tickets(query, limit, offset))).all()
+        return [{**column_values(ticket), "score": score} for ticket, score in rows]
+
+    async def update(self, id: int, project_id: int, title: str, description: str, status: str, priority: str,
+                     kanban_status_id: int):
+        return await super().update(id, project_id=project_id, title=title, description=description, status=status,
+                                    priority=priority, kanban_status_id=kanban_status_id)
+
+    async def patch(self, id: int, **changes):
+        """``AsyncBaseCRUD.patch``, restoring the ticket first when it is archived"""
+        await self.begin_write()
+        ranked, = await self._ranked_moves([{**changes, "id": id}])
+        item = await super().patch(**ranked)
+        if item is None and await self.restore(id):
+            await self.begin_write()
+            ranked, = await self._ranked_moves([{**changes, "id": id}])
+            item = await super().patch(**ranked)
+        return item
+
+    async def bulk_update(self, items: List[dict]) -> Set[int]:
+        await self.begin_write()
+        return await super().bulk_update(await self._ranked_moves(items))
+
+    async def delete(self, id: int):
+        deleted = await super().delete(id)
+        if deleted is None and await self.restore(id):
+            deleted = await super().delete(id)
+        return deleted
+
+
+class AsyncDeltaCRUD(DeltaStatements):
+    """Changes of every synced table since a set of change versions, on an AsyncSession"""
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_changes(self, since: Optional[Dict[str, int]] = None) -> dict:
+        """Rows written and deleted after ``since`` (everything when None), with the versions they are current to"""
+        until = dict((await self.db.execute(self._current_versions())).all())
+        changes = {"versions": until, "deleted": []}
+        for model in SYNC_MODELS:
+            table = model.__tablename__
+            after = since.get(table, 0) if since is not None else -1
+            changes[table] = (await self.db.execute(self._changed_rows(model, after, until.get(table, 0)))).all()
+            if since is not None:
+                changes["deleted"].extend((await self.db.execute(self._deleted_rows(model, after, until.get(table, 0)))).all())
+        return changes
+
+
+class AsyncKanbanBoardCRUD(BoardViewStatements, TicketStatsStatements, AsyncBaseCRUD):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, KanbanBoard)
+
+    async def create(self, name: str, description: str):
+        return await super().create(name=name, description=description)
+
+    async def get(self, id: int):
+        return await super().get(id)
+
+    async def get_all(self):
+        return await super().get_all()
+
+    async def get_page(self, limit: int, after_id: Optional[int] = None):
+        return await super().get_page(limit, after_id)
+
+    async def get_page_rows(self, limit: int, after_id: Optional[int] = None):
+        return await super().get_page_rows(limit, after_id)
+
+    def stream(self, batch_size: int = 1000, after_id: Optional[int] = None):
+        return super().stream(batch_size, after_id)
+
+    def stream_rows(self, batch_size: int = 1000, after_id: Optional[int] = None):
+        return super().stream_rows(batch_size, after_id)
+
+    async def get_view(self, id: int, tickets_per_column: int = 20) -> Optional[dict]:
+        """Board with its statuses, their ticket counts and first tickets, in three queries"""
+        board = await self.get(id)
+        if board is None:
+            return None
+        statuses = (await self.db.execute(self._view_statuses(id))).all()
+        tickets = (await self.db.scalars(self._view_tickets(id, tickets_per_column))).all()
+        return self._assemble_view(board, statuses, tickets)
+
+    async def get_view_version(self) -> Optional[int]:
+        return self._view_version((await self.db.scalars(self._view_versions())).all())
+
+    async def get_stats(self, id: int) -> Optional[dict]:
+        """Ticket counts of the statuses of a board by project and priority, from the summary table"""
+        if await self.get(id) is None:
+            return None
+        return self._assemble_stats((await self.db.execute(self._board_counts(id))).all())
+
+    async def update(self, id: int, name: str, description: str) -> KanbanBoard:
+        return await super().update(id, name=name, description=description)
+
+    async def delete(self, id: int) -> None:
+        return await super().delete(id)
+
+
+class AsyncKanbanStatusCRUD(AsyncBaseCRUD):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, KanbanStatus)
+
+    async def create(self, name: str, description: str, board_id: int):
+        return await super().create(name=name, description=description, board_id=board_id)
+
+    async def get(self, id: int):
+        return await super().get(id)
+
+    async def get_all(self):
+        return await super().get_all()
+
+    async def get_page(self, limit: int, after_id: Optional[int] = None, board_id: Optional[int] = None):
+        return await super().get_page(limit, after_id, board_id=board_id)
+
+    async def get_page_rows(self, limit: int, after_id: Optional[int] = None, board_id: Optional[int] = None):
+        return await super().get_page_rows(limit, after_id, board_id=board_id)
+
+    def stream(self, batch_size: int = 1000, after_id: Optional[int] = None, board_id: Optional[int] = None):
+        return super().stream(batch_size, after_id, board_id=board_id)
+
+    def stream_rows(self, batch_size: int = 1000, after_id: Optional[int] = None, board_id: Optional[int] = None):
+        return super().stream_rows(batch_size, after_id, board_id=board_id)
+
+    async def update(self, id: int, name: str, description: str, board_id: int):
+        return await super().update(id, name=name, description=description, board_id=board_id)
+
+    async def delete(self, id: int):
+        return await super().delete(id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import datetime
@@ -6,6 +6,9 @@ import datetime
 
 Base = declarative_base()
 
+# Ranks order by their bytes, PostgreSQL would otherwise compare them with the locale of the database
+RankString = String(255).with_variant(String(255, collation="C"), "postgresql")
+
 
 class Project(Base):
     __tablename__ = "projects"
@@ -16,9 +19,16 @@ class Project(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     kanban_board_id = Column(Integer, ForeignKey("kanban_boards.id"), nullable=False)
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     kanban_board = relationship("KanbanBoard", back_populates="projects")
     tickets = relationship("Ticket", back_populates="project")
+    
+    __table_args__ = (
+        Index("ix_projects_kanban_board_id", "kanban_board_id", "id"),
+        Index("ix_projects_updated_at", "updated_at"),
+        Index("ix_projects_change_version", "change_version"),
+    )
 
 class Ticket(Base):
     __tablename__ = "tickets"
@@ -32,9 +42,50 @@ class Ticket(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     kanban_status_id = Column(Integer, ForeignKey("kanban_statuses.id"), nullable=False)
+    # Position in the kanban column, see app.db_models.ranking
+    rank = Column(RankString, nullable=False, default="", server_default="")
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     project = relationship("Project", back_populates="tickets")
     kanban_status = relationship('KanbanStatus', back_populates='tickets')
+    
+    __table_args__ = (
+        Index("ix_tickets_project_id", "project_id", "id"),
+        Index("ix_tickets_project_id_kanban_status_id", "project_id", "kanban_status_id", "id"),
+        Index("ix_tickets_kanban_status_id", "kanban_status_id", "id"),
+        Index("ix_tickets_kanban_status_id_rank", "kanban_status_id", "rank", "id"),
+        Index("ix_tickets_status", "status", "id"),
+        Index("ix_tickets_priority", "priority", "id"),
+        Index("ix_tickets_updated_at", "updated_at"),
+        Index("ix_tickets_change_version", "change_version"),
+        # Ids of archived tickets stay reserved, SQLite would otherwise hand out the largest id again once it left the table
+        {"sqlite_autoincrement": True, "info": {"id_tables": ("archived_tickets",)}},
+    )
+
+
+class ArchivedTicket(Base):
+    """Ticket moved out of ``tickets`` by the archiver, with the same columns"""
+    __tablename__ = "archived_tickets"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    project_id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    status = Column(String(255), nullable=False)
+    priority = Column(String(255), nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    kanban_status_id = Column(Integer, nullable=False)
+    rank = Column(RankString, nullable=False, default="", server_default="")
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")
+    archived_at = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_archived_tickets_project_id", "project_id", "id"),
+        Index("ix_archived_tickets_kanban_status_id", "kanban_status_id", "id"),
+        Index("ix_archived_tickets_status", "status", "id"),
+        Index("ix_archived_tickets_priority", "priority", "id"),
+    )
 
 
 class KanbanBoard(Base):
@@ -45,9 +96,15 @@ class KanbanBoard(Base):
     description = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     projects = relationship('Project', back_populates='kanban_board')
     statuses = relationship('KanbanStatus', back_populates='kanban_board')
+    
+    __table_args__ = (
+        Index("ix_kanban_boards_updated_at", "updated_at"),
+        Index("ix_kanban_boards_change_version", "change_version"),
+    )
 
 class KanbanStatus(Base):
     __tablename__ = "kanban_statuses"
@@ -58,7 +115,57 @@ class KanbanStatus(Base):
     board_id = Column(Integer, ForeignKey("kanban_boards.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     kanban_board = relationship('KanbanBoard', back_populates='statuses')
     tickets = relationship('Ticket', back_populates='kanban_status')
+    
+    __table_args__ = (
+        Index("ix_kanban_statuses_board_id", "board_id", "id"),
+        Index("ix_kanban_statuses_updated_at", "updated_at"),
+        Index("ix_kanban_statuses_change_version", "change_version"),
+    )
+
 
+class TicketCount(Base):
+    """Tickets per project, kanban status and priority, kept in step by the CRUD layer"""
+    __tablename__ = "ticket_counts"
+    
+    project_id = Column(Integer, primary_key=True)
+    kanban_status_id = Column(Integer, primary_key=True)
+    priority = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_ticket_counts_kanban_status_id", "kanban_status_id"),
+    )
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    
+    table_name = Column(String(255), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_versions"
+    
+    name = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
+class Tombstone(Base):
+    """Deleted row, kept so delta sync clients learn about deletes"""
+    __tablename__ = "tombstones"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(255), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    change_version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_tombstones_table_name_change_version", "table_name", "change_version"),
+    )
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""Read-through cache of entity rows used by the CRUD classes.
+
+Entries hold the column values of one row keyed by table name and id, never ORM
+objects, so they can be shared between sessions and serialized to a shared
+backend as JSON. The CRUD classes invalidate an entry after every update or delete.
+
+Every invalidation also changes the cache generation. A loaded row is only stored
+when the generation is still the one taken before the load, so a reader racing
+with a write cannot put back the row the write just invalidated.
+"""
+import datetime
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from pydantic_core import from_json, to_json
+from sqlalchemy import DateTime
+
+from app.core.config import get_app_settings
+from app.core.settings.app import AppSettings
+from app.db_models.base import Base
+
+
+# Key of the generation token in the shared backend, entry keys always contain a colon
+GENERATION_KEY = "generation"
+
+
+class CacheBackend(ABC):
+    """Interface of a cache shared between workers (e.g. Redis), values are bytes"""
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Local stand-in for a shared backend, for tests and single process deployments"""
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class LRUCache:
+    """In-process LRU cache bounded by entry count, entries expire after ``ttl`` seconds"""
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache
+def _datetime_columns(table: str) -> Tuple[str, ...]:
+    return tuple(column.name for column in Base.metadata.tables[table].columns if isinstance(column.type, DateTime))
+
+
+def encode_values(values: dict) -> bytes:
+    return to_json(values)
+
+
+def decode_values(table: str, payload: bytes) -> dict:
+    """Column values from their JSON encoding, with the DateTime columns parsed back"""
+    values = from_json(payload)
+    for name in _datetime_columns(table):
+        if values.get(name) is not None:
+            values[name] = datetime.datetime.fromisoformat(values[name])
+    return values
+
+
+class EntityCache:
+    """Column values of rows keyed by table and id, in a local LRU backed by an optional shared backend"""
+    def __init__(self, local: LRUCache, shared: Optional[CacheBackend] = None, tables: Iterable[str] = ()):
+        self.local = local
+        self.shared = shared
+        self.tables = frozenset(tables)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(table: str, id: int) -> str:
+        return f"{table}:{id}"
+
+    def enabled_for(self, table: str) -> bool:
+        return table in self.tables
+
+    def get(self, table: str, id: int) -> Optional[dict]:
+        key = self.key(table, id)
+        values = self.local.get(key)
+        if values is None and self.shared is not None:
+            payload = self.shared.get(key)
+            if payload is not None:
+                values = decode_values(table, payload)
+                self.local.set(key, values)
+        return values
+
+    def generation(self) -> Hashable:
+        """Token changed by every invalidation, in this process or through the shared backend"""
+        shared = self.shared.get(GENERATION_KEY) if self.shared is not None else None
+        return self._generation, shared
+
+    def set(self, table: str, id: int, values: dict, generation: Hashable) -> None:
+        """Store values loaded after ``generation`` was taken, unless an invalidation happened since"""
+        key = self.key(table, id)
+        with self._lock:
+            if generation != self.generation():
+                return
+            self.local.set(key, values)
+            if self.shared is not None:
+                self.shared.set(key, encode_values(values), self.local.ttl)
+
+    def invalidate(self, table: str, ids: Iterable[int]) -> None:
+        keys = [self.key(table, id) for id in ids]
+        with self._lock:
+            self._generation += 1
+            self.local.delete(*keys)
+            if self.shared is not None:
+                self.shared.set(GENERATION_KEY, os.urandom(16), self.local.ttl)
+                self.shared.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**asdict(self.local.stats), "size": len(self.local), "max_size": self.local.max_size}
+
+
+def create_entity_cache(settings: AppSettings) -> EntityCache:
+    shared = InMemoryCacheBackend() if settings.entity_cache_shared_backend == "memory" else None
+    local = LRUCache(max_size=settings.entity_cache_size, ttl=settings.entity_cache_ttl)
+    return EntityCache(local, shared, settings.entity_cache_tables)
+
+
+entity_cache = create_entity_cache(get_app_settings())
@@ -0,0 +1,113 @@
+"""In-process pub/sub bus of committed row changes, grouped by kanban board.
+
+The CRUD classes publish a ``ChangeEvent`` after every committed write. Events get
+a sequence number and are kept in a bounded ring buffer so a subscriber can resume
+from the last id it saw. Subscribers get events of their board through a bounded
+queue. A subscriber whose queue is full is marked as lagging instead of blocking
+the publisher, and catches up from the ring buffer.
+"""
+import asyncio
+import datetime
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_app_settings
+from app.core.settings.app import AppSettings
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    id: int
+    board_id: Optional[int]
+    table: str
+    op: str
+    row_id: int
+    data: Dict[str, Any]
+    at: datetime.datetime
+
+
+class Subscription:
+    """Bounded queue of the events of one board for one consumer"""
+    def __init__(self, board_id: int, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.board_id = board_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[ChangeEvent]" = asyncio.Queue(maxsize=maxsize)
+        self.lagging = False
+
+    def _put(self, event: ChangeEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+    def deliver(self, event: ChangeEvent) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._put(event)
+        else:
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def drain(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.lagging = False
+
+
+class ChangeBus:
+    def __init__(self, buffer_size: int = 1024, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._buffer: Deque[ChangeEvent] = deque(maxlen=buffer_size)
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, board_id: Optional[int], table: str, op: str, data: Dict[str, Any]) -> ChangeEvent:
+        with self._lock:
+            self._last_id += 1
+            event = ChangeEvent(self._last_id, board_id, table, op, data["id"], data, datetime.datetime.utcnow())
+            self._buffer.append(event)
+            subscribers = list(self._subscribers.get(board_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self, board_id: int) -> Subscription:
+        subscription = Subscription(board_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(board_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.board_id]
+
+    def since(self, last_id: int, board_id: int) -> Tuple[List[ChangeEvent], bool]:
+        """Buffered events of a board after ``last_id``, and False when older events were already evicted"""
+        with self._lock:
+            events = list(self._buffer)
+        complete = not events or events[0].id <= last_id + 1 or last_id >= self._last_id
+        return [event for event in events if event.id > last_id and event.board_id == board_id], complete
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def create_change_bus(settings: AppSettings) -> ChangeBus:
+    return ChangeBus(buffer_size=settings.change_feed_buffer_size, queue_size=settings.change_feed_queue_size)
+
+
+change_bus = create_change_bus(get_app_settings())
@@ -0,0 +1,207 @@
+"""Group commit of concurrent single-row writes.
+
+SQLite has one writer at a time, so concurrent requests writing a row each wait
+for the write lock and sync the journal in turn. With write coalescing enabled,
+routes hand their CRUD write to ``coalesced``, which queues it for a single
+writer task. The writer takes the writes queued within a few milliseconds (up to
+a batch size) and runs them on one session, each in its own savepoint, and
+commits them together. A failing write only rolls back its savepoint, so every
+caller still gets its own result or error. Change events and cache invalidation
+of the batch run after the commit.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+from app.core.config import get_app_settings
+from app.core.metrics import registry
+from app.core.settings.app import AppSettings
+from app.db_models.session import SQLITE_BEGIN, AsyncSessionLocal
+
+
+# Key of the running batch in ``AsyncSession.info``
+WRITE_BATCH = "write_batch"
+
+T = TypeVar("T")
+
+
+class WriteBatch:
+    """Transaction shared by the writes of a batch, the current write runs in ``savepoint``.
+
+    Post-commit steps of the current write wait in ``pending`` and join ``after_commit``
+    when the write keeps its work.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.savepoint: Optional[AsyncSessionTransaction] = None
+        self.pending: List[Callable[[], None]] = []
+        self.after_commit: List[Callable[[], None]] = []
+
+    async def begin(self) -> None:
+        self.savepoint = await self.db.begin_nested()
+
+    def _open(self) -> bool:
+        # A savepoint deactivated by a failed flush is still open and has to be rolled back
+        return self.db.sync_session.get_nested_transaction() is self.savepoint.sync_transaction
+
+    async def release(self) -> None:
+        """Keep the work of the current write, further statements of the write get a new savepoint"""
+        if self._open():
+            await self.savepoint.commit()
+        self.after_commit.extend(self.pending)
+        self.pending = []
+        await self.begin()
+
+    async def rollback(self) -> None:
+        """Undo the current write up to its last release"""
+        if self._open():
+            await self.savepoint.rollback()
+        self.pending = []
+        await self.begin()
+
+    async def end(self, keep: bool) -> None:
+        if self._open():
+            await (self.savepoint.commit() if keep else self.savepoint.rollback())
+        if keep:
+            self.after_commit.extend(self.pending)
+        self.pending = []
+        self.savepoint = None
+
+
+@dataclass
+class PendingWrite:
+    crud_class: type
+    method: str
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+class WriteCoalescer:
+    """Queue of CRUD writes committed in batches by a single writer task"""
+    def __init__(self, session_factory: Callable[[], AsyncSession], batch_size: int = 64, batch_delay: float = 0.002):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue: Optional["asyncio.Queue[PendingWrite]"] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def _start(self) -> None:
+        # The queue and the writer belong to the loop of the first write, and are replaced when the loop changes
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.queue = asyncio.Queue()
+            self.task = loop.create_task(self._run())
+
+    async def submit(self, crud_class: type, method: str, *args, **kwargs) -> Any:
+        """Run ``crud_class(db).method(*args, **kwargs)`` in the next batch and return its result"""
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(PendingWrite(crud_class, method, args, kwargs, future))
+        return await future
+
+    async def close(self) -> None:
+        """Commit the writes already queued and stop the writer"""
+        if self.task is None or self.task.done():
+            return
+        await self.queue.join()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def _take_queued(self, batch: List[PendingWrite]) -> List[PendingWrite]:
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _next_batch(self) -> List[PendingWrite]:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_delay
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return self._take_queued(batch)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            except Exception as error:
+                logger.exception("Write batch failed")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(error)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _write(self, batch: List[PendingWrite]) -> None:
+        outcomes: List[Tuple[PendingWrite, Any, Optional[BaseException]]] = []
+        async with self.session_factory() as db:
+            await db.connection(execution_options={SQLITE_BEGIN: "IMMEDIATE"})
+            write_batch = WriteBatch(db)
+            db.info[WRITE_BATCH] = write_batch
+            for pending in batch:
+                if pending.future.cancelled():
+                    continue
+                await write_batch.begin()
+                try:
+                    result = await getattr(pending.crud_class(db), pending.method)(*pending.args, **pending.kwargs)
+                except Exception as error:
+                    await write_batch.end(keep=False)
+                    outcomes.append((pending, None, error))
+                else:
+                    await write_batch.end(keep=True)
+                    outcomes.append((pending, result, None))
+            await db.commit()
+            for step in write_batch.after_commit:
+                try:
+                    step()
+                except Exception:
+                    logger.exception("Post-commit step of a write batch failed")
+        with registry.lock:
+            registry.write_batch_size.observe((), len(outcomes))
+            for pending, _, _ in outcomes:
+                registry.write_queue_seconds.observe((), time.perf_counter() - pending.queued_at)
+        for pending, result, error in outcomes:
+            if pending.future.done():
+                continue
+            if error is None:
+                pending.future.set_result(result)
+            else:
+                pending.future.set_exception(error)
+
+
+def create_write_coalescer(settings: AppSettings) -> Optional[WriteCoalescer]:
+    if not settings.write_coalescing:
+        return None
+    return WriteCoalescer(AsyncSessionLocal, batch_size=settings.write_batch_size,
+                          batch_delay=settings.write_batch_delay_ms / 1000)
+
+
+write_coalescer = create_write_coalescer(get_app_settings())
+
+
+async def coalesced(write: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+    """Await a bound CRUD write method, through the write coalescer when write coalescing is enabled"""
+    if write_coalescer is None:
+        return await write(*args, **kwargs)
+    # The writer needs the write lock, which the transaction of the caller's session may hold after its reads
+    db = write.__self__.db
+    if db.in_transaction():
+        await db.commit()
+    return await write_coalescer.submit(type(write.__self__), write.__name__, *args, **kwargs)
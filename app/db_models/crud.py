@@ -1,138 +1,390 @@
-from sqlalchemy.orm import Session
-from abc import ABC, abstractmethod
+from sqlalchemy import Delete, Insert, Select, Subquery, Update, delete, event, func, insert, select, tuple_, union_all, update
+from sqlalchemy.orm import Session, aliased
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.db_models.base import *
+from app.db_models.aggregates import COUNT_KEYS, count_deltas
+from app.db_models.cache import entity_cache
+from app.db_models.changes import change_bus
+from app.db_models.ranking import rank_between
 
 
-class CRUDInterface(ABC):
-    @abstractmethod
-    def create(self, **kwargs):
-        pass
+def column_values(item) -> dict:
+    return {column.key: getattr(item, column.key) for column in item.__table__.columns}
 
-    @abstractmethod
-    def get(self, id: int):
-        pass
 
-    @abstractmethod
-    def get_all(self):
-        pass
+class CRUDStatements:
+    """SQL statements shared by the CRUD classes of every model"""
+    model = None
 
-    @abstractmethod
-    def update(self, id: int, **kwargs):
-        pass
+    def _filtered_select(self, after_id: Optional[int] = None, **filters) -> Select:
+        statement = select(self.model)
+        for key, value in filters.items():
+            if value is not None:
+                statement = statement.where(getattr(self.model, key) == value)
+        if after_id is not None:
+            statement = statement.where(self.model.id > after_id)
+        return statement.order_by(self.model.id)
 
-    @abstractmethod
-    def delete(self, id: int):
-        pass
+    def _filtered_rows(self, after_id: Optional[int] = None, **filters) -> Select:
+        """``_filtered_select`` returning plain column rows instead of ORM objects"""
+        return self._filtered_select(after_id, **filters).with_only_columns(*self.model.__table__.c)
 
+    def _bulk_insert(self) -> Insert:
+        table = self.model.__table__
+        return insert(table).returning(*table.c, sort_by_parameter_order=True)
 
-class BaseCRUD(CRUDInterface):
-    """Base CRUD class for all models"""
-    def __init__(self, db: Session, model=None):
-        self.db = db
-        self.model = model
-    
-    def create(self, **kwargs):
-        item = self.model(**kwargs)
-        self.db.add(item)
-        self.db.commit()
-        self.db.refresh(item)
-        return item
-
-    def get(self, id: int):
-        return self.db.query(self.model).filter(self.model.id == id).first()
-
-    def get_all(self):
-        return self.db.query(self.model).all()
-
-    def update(self, id: int, **kwargs):
-        item = self.get(id)
-        for key, value in kwargs.items():
-            setattr(item, key, value)
-        self.db.commit()
-        self.db.refresh(item)
-        return item
-
-    def delete(self, id: int):
-        item = self.get(id)
-        self.db.delete(item)
-        self.db.commit()
-
-
-class ProjectCRUD(BaseCRUD):
-    def __init__(self, db: Session):
-        super().__init__(db, Project)
-    
-    def create(self, name: str, description: str):
-        return super().create(name=name, description=description)
-    
-    def get(self, id: int):
-        return super().get(id)
-    
-    def get_all(self):
-        return super().get_all()
-    
-    def update(self, id: int, name: str, description: str):
-        return super().update(id, name=name, description=description)
-    
-    def delete(self, id: int):
-        return super().delete(id)
+    def _existing_ids(self, ids: List[int]) -> Select:
+        return select(self.model.id).where(self.model.id.in_(ids))
 
+    def _rows_by_id(self, ids: Iterable[int]) -> Select:
+        return select(*self.model.__table__.c).where(self.model.id.in_(list(ids))).order_by(self.model.id)
 
-class TicketCRUD(BaseCRUD):
-    def __init__(self, db: Session):
-        super().__init__(db, Ticket)
-    
-    def create(self, project_id: int, title: str, description: str, status: str, priority: str):
-        return super().create(project_id=project_id, title=title, description=description, status=status, priority=priority)
-    
-    def get(self, id: int):
-        return super().get(id)
-    
-    def get_all(self):
-        return super().get_all()
-    
-    def update(self, id: int, project_id: int, title: str, description: str, status: str, priority: str):
-        return super().update(id, project_id=project_id, title=title, description=description, status=status, priority=priority)
-    
-    def delete(self, id: int):
-        return super().delete(id)
+    def _bulk_delete(self, ids: Iterable[int]) -> Delete:
+        table = self.model.__table__
+        return delete(table).where(table.c.id.in_(list(ids))).returning(*table.c)
 
+    def _insert_returning(self, values: dict) -> Insert:
+        table = self.model.__table__
+        return insert(table).values(**values).returning(*table.c)
 
-class KanbanBoardCRUD(BaseCRUD):
-    def __init__(self, db: Session):
-        super().__init__(db, KanbanBoard)
-        
-    def create(self, name: str, description: str):
-        return super().create(name=name, description=description)
-    
-    def get(self, id: int):
-        return super().get(id)
-    
-    def get_all(self):
-        return super().get_all()
-    
-    def update(self, id: int, name: str, description: str) -> KanbanBoard:
-        return super().update(id, name=name, description=description)
-    
-    def delete(self, id: int) -> None:
-        return super().delete(id)
+    def _update_returning(self, id: int, values: dict) -> Update:
+        table = self.model.__table__
+        return update(table).where(table.c.id == id).values(**values).returning(*table.c)
 
+    def _delete_returning(self, id: int) -> Delete:
+        table = self.model.__table__
+        return delete(table).where(table.c.id == id).returning(*table.c)
 
-class KanbanStatusCRUD(BaseCRUD):
-    def __init__(self, db: Session):
-        super().__init__(db, KanbanStatus)
-    
-    def create(self, name: str, description: str, board_id: int):
-        return super().create(name=name, description=description, board_id=board_id)
-    
-    def get(self, id: int):
-        return super().get(id)
+    def _updated_at(self, id: int) -> Select:
+        return select(self.model.updated_at).where(self.model.id == id)
+
+    def _table_version(self) -> Select:
+        versions = TableVersion.__table__
+        return select(versions.c.version).where(versions.c.table_name == self.model.__tablename__)
+
+    def _bump_version(self) -> Update:
+        """Increment and return the change counter of the table, run first in the transaction of every write.
+
+        Written rows are stamped with the new value in ``change_version``. Bumping
+        first locks the counter row, so concurrent writers get increasing versions.
+        """
+        versions = TableVersion.__table__
+        return (
+            update(versions)
+            .where(versions.c.table_name == self.model.__tablename__)
+            .values(version=versions.c.version + 1)
+            .returning(versions.c.version)
+        )
+
+    def _tombstones(self, ids: Iterable[int], version: int) -> Insert:
+        """Record deleted rows for delta sync, in the transaction of the delete"""
+        table = self.model.__tablename__
+        return insert(Tombstone).values(
+            [{"table_name": table, "row_id": id, "change_version": version} for id in ids]
+        )
+
+
+# Key in ``Session.info`` of the entity cache generation taken when the transaction began
+CACHE_GENERATION = "cache_generation"
+
+
+@event.listens_for(Session, "after_begin")
+def _take_cache_generation(session, _transaction, _connection) -> None:
+    # Taken before the first statement, rows read in the transaction are at least as new as the generation
+    if entity_cache.tables:
+        session.info[CACHE_GENERATION] = entity_cache.generation()
+
+
+class EntityCacheMixin:
+    """Read-through entity cache helpers of the CRUD classes"""
+    model = None
+
+    def _cached(self, id: int):
+        table = self.model.__tablename__
+        if not entity_cache.enabled_for(table):
+            return None
+        values = entity_cache.get(table, id)
+        return self.model(**values) if values is not None else None
+
+    def _cache_store(self, item) -> None:
+        table = self.model.__tablename__
+        if item is not None and entity_cache.enabled_for(table):
+            values = column_values(item)
+            entity_cache.set(table, item.id, values, self.db.info.get(CACHE_GENERATION))
+
+    def _cache_invalidate(self, ids: Iterable[int]) -> None:
+        table = self.model.__tablename__
+        if entity_cache.enabled_for(table):
+            entity_cache.invalidate(table, ids)
+
+
+# Column holding the board of a row, tickets are resolved through their kanban status
+BOARD_COLUMNS = {
+    KanbanBoard.__tablename__: "id",
+    KanbanStatus.__tablename__: "board_id",
+    Project.__tablename__: "kanban_board_id",
+}
+
+
+class ChangeFeedMixin:
+    """Change feed helpers of the CRUD classes, publishing committed rows to ``change_bus``"""
+    model = None
+
+    def _status_boards(self, rows: List[dict]) -> Tuple[Dict[int, int], Optional[Select]]:
+        """Board of the kanban status of ticket rows from the entity cache, and a statement selecting the others"""
+        if self.model.__tablename__ in BOARD_COLUMNS:
+            return {}, None
+        table = KanbanStatus.__tablename__
+        boards, missing = {}, set()
+        for values in rows:
+            status_id = values["kanban_status_id"]
+            cached = entity_cache.get(table, status_id) if entity_cache.enabled_for(table) else None
+            if cached is not None:
+                boards[status_id] = cached["board_id"]
+            else:
+                missing.add(status_id)
+        if not missing:
+            return boards, None
+        return boards, select(KanbanStatus.id, KanbanStatus.board_id).where(KanbanStatus.id.in_(missing))
+
+    def _publish(self, op: str, rows: List[dict], status_boards: Dict[int, int]) -> None:
+        table = self.model.__tablename__
+        column = BOARD_COLUMNS.get(table)
+        for values in rows:
+            board_id = values[column] if column else status_boards.get(values["kanban_status_id"])
+            change_bus.publish(board_id, table, op, values)
+
+
+class TicketCountMixin:
+    """Helpers keeping ``ticket_counts`` in step with the ticket writes of the CRUD classes"""
+    model = None
+
+    def _counted_rows(self, ids: Iterable[int], changed: Iterable[str]) -> Optional[Select]:
+        """Counted columns of tickets about to be updated, None when the update cannot move their counts"""
+        if self.model is not Ticket or not set(COUNT_KEYS) & set(changed):
+            return None
+        return select(Ticket.id, *(getattr(Ticket, key) for key in COUNT_KEYS)).where(Ticket.id.in_(list(ids)))
+
+    def _count_deltas(self, removed: List[dict], added: List[dict]) -> List[dict]:
+        return count_deltas(removed, added) if self.model is Ticket else []
+
+    def _updated_counts(self, before: list, items: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Counted columns of updated tickets before and after applying ``items``"""
+        changes = {item["id"]: item for item in items}
+        removed = [row._asdict() for row in before]
+        added = [{**values, **{key: changes[values["id"]][key] for key in COUNT_KEYS if key in changes[values["id"]]}}
+                 for values in removed]
+        return removed, added
+
+
+class TicketStatsStatements:
+    """Statements reading ticket counts from the ``ticket_counts`` summary rows instead of the tickets"""
+    def _project_counts(self, project_id: int) -> Select:
+        counts = TicketCount.__table__
+        return select(*counts.c).where(counts.c.project_id == project_id, counts.c.count != 0)
+
+    def _board_counts(self, board_id: int) -> Select:
+        counts = TicketCount.__table__
+        return (
+            select(*counts.c)
+            .join(KanbanStatus, KanbanStatus.id == counts.c.kanban_status_id)
+            .where(KanbanStatus.board_id == board_id, counts.c.count != 0)
+        )
+
+    def _assemble_stats(self, counts) -> dict:
+        stats = {"total": 0, "by_project": {}, "by_status": {}, "by_priority": {}, "counts": counts}
+        for cell in counts:
+            stats["total"] += cell.count
+            for key, group in ((cell.project_id, "by_project"), (cell.kanban_status_id, "by_status"), (cell.priority, "by_priority")):
+                stats[group][key] = stats[group].get(key, 0) + cell.count
+        return stats
+
+
+class TicketRankStatements:
+    """Statements placing tickets in their kanban column by rank, backed by the (kanban_status_id, rank, id) index"""
+    def _anchor(self, id: int) -> Select:
+        return select(Ticket.id, Ticket.kanban_status_id, Ticket.rank).where(Ticket.id == id)
+
+    def _columns_by_id(self, ids: Iterable[int]) -> Select:
+        return select(Ticket.id, Ticket.kanban_status_id).where(Ticket.id.in_(ids))
+
+    def _last_rank(self, kanban_status_id: int, exclude_id: Optional[int] = None) -> Select:
+        statement = select(Ticket.rank).where(Ticket.kanban_status_id == kanban_status_id)
+        if exclude_id is not None:
+            statement = statement.where(Ticket.id != exclude_id)
+        return statement.order_by(Ticket.rank.desc(), Ticket.id.desc()).limit(1)
+
+    def _adjacent_rank(self, anchor, following: bool, exclude_id: int) -> Select:
+        """Rank of the ticket right after (``following``) or right before ``anchor`` in its column"""
+        position = tuple_(Ticket.rank, Ticket.id)
+        anchor_position = tuple_(anchor.rank, anchor.id)
+        statement = select(Ticket.rank).where(
+            Ticket.kanban_status_id == anchor.kanban_status_id,
+            Ticket.id != exclude_id,
+            position > anchor_position if following else position < anchor_position,
+        )
+        order = (Ticket.rank, Ticket.id) if following else (Ticket.rank.desc(), Ticket.id.desc())
+        return statement.order_by(*order).limit(1)
+
+    def _column_ids(self, kanban_status_id: int) -> Select:
+        return select(Ticket.id).where(Ticket.kanban_status_id == kanban_status_id).order_by(Ticket.rank, Ticket.id)
+
+    def _check_anchors(self, id: int, kanban_status_id: int, after_id: Optional[int], after,
+                       before_id: Optional[int], before) -> None:
+        for name, anchor_id, anchor in (("after_id", after_id, after), ("before_id", before_id, before)):
+            if anchor_id is None:
+                continue
+            if anchor is None:
+                raise ValueError(f"Ticket {anchor_id} not found")
+            if anchor.id == id:
+                raise ValueError(f"{name} must be another ticket")
+            if anchor.kanban_status_id != kanban_status_id:
+                raise ValueError(f"Ticket {anchor.id} is not in kanban status {kanban_status_id}")
+        if after is not None and before is not None and (after.rank, after.id) >= (before.rank, before.id):
+            raise ValueError(f"Ticket {after.id} does not come before ticket {before.id}")
+
+    def _has_room(self, lower: Optional[str], upper: Optional[str]) -> bool:
+        """Whether a rank fits between two neighbours, tickets written before ranks existed all share an empty one"""
+        return upper is None or (upper != "" and (lower or "") < upper)
+
+    def _ranked(self, items: List[dict], last_ranks: Dict[int, Optional[str]]) -> List[dict]:
+        """Items with ranks appending them to the end of their columns, in input order"""
+        ranked = []
+        for item in items:
+            rank = rank_between(last_ranks[item["kanban_status_id"]], None)
+            last_ranks[item["kanban_status_id"]] = rank
+            ranked.append({**item, "rank": rank})
+        return ranked
+
+
+class TicketArchiveStatements:
+    """Statements moving old tickets to ``archived_tickets`` and back, and reading both tables"""
+    def _all_tickets(self) -> Subquery:
+        columns = [column.key for column in Ticket.__table__.c]
+        return union_all(
+            *(select(*(model.__table__.c[key] for key in columns)) for model in (Ticket, ArchivedTicket))
+        ).subquery("all_tickets")
+
+    def _filtered_select(self, after_id: Optional[int] = None, include_archived: bool = False, **filters) -> Select:
+        if not include_archived:
+            return super()._filtered_select(after_id, **filters)
+        tickets = aliased(Ticket, self._all_tickets())
+        statement = select(tickets)
+        for key, value in filters.items():
+            if value is not None:
+                statement = statement.where(getattr(tickets, key) == value)
+        if after_id is not None:
+            statement = statement.where(tickets.id > after_id)
+        return statement.order_by(tickets.id)
+
+    def _filtered_rows(self, after_id: Optional[int] = None, include_archived: bool = False, **filters) -> Select:
+        if not include_archived:
+            return super()._filtered_rows(after_id, **filters)
+        statement = self._filtered_select(after_id, include_archived, **filters)
+        return statement.with_only_columns(*statement.selected_columns)
+
+    def _archive_delete(self, statuses: Iterable[str], before: datetime.datetime, limit: int) -> Delete:
+        """Delete up to ``limit`` tickets in ``statuses`` not updated since ``before``, oldest ids first"""
+        table = Ticket.__table__
+        ids = (
+            select(table.c.id)
+            .where(table.c.status.in_(list(statuses)), table.c.updated_at < before)
+            .order_by(table.c.id)
+            .limit(limit)
+        )
+        return delete(table).where(table.c.id.in_(ids)).returning(*table.c)
+
+    def _archive_insert(self) -> Insert:
+        return insert(ArchivedTicket.__table__)
+
+    def _unarchive(self, id: int) -> Delete:
+        table = ArchivedTicket.__table__
+        return delete(table).where(table.c.id == id).returning(*(table.c[column.key] for column in Ticket.__table__.c))
+
+    def _restore_insert(self, values: dict) -> Insert:
+        return insert(Ticket.__table__).values(**values)
+
+    def _restored_tombstones(self, id: int) -> Delete:
+        """Tombstones written when the ticket was archived, so delta sync does not report it deleted"""
+        return delete(Tombstone).where(Tombstone.table_name == Ticket.__tablename__, Tombstone.row_id == id)
+
+
+class BoardViewStatements:
+    """Statements loading a board with its columns in a fixed number of queries"""
+    # Tables whose changes can alter a board view
+    VIEW_TABLES = (KanbanBoard.__tablename__, KanbanStatus.__tablename__, Ticket.__tablename__)
     
-    def get_all(self):
-        return super().get_all()
+    def _view_versions(self) -> Select:
+        versions = TableVersion.__table__
+        return select(versions.c.version).where(versions.c.table_name.in_(self.VIEW_TABLES))
     
-    def update(self, id: int, name: str, description: str, board_id: int):
-        return super().update(id, name=name, description=description, board_id=board_id)
+    def _view_version(self, versions: List[int]) -> Optional[int]:
+        # Every counter only grows, so their sum changes with any change to the view tables
+        return sum(versions) if len(versions) == len(self.VIEW_TABLES) else None
     
-    def delete(self, id: int):
-        return super().delete(id)
\ No newline at end of file
+    def _view_statuses(self, board_id: int) -> Select:
+        ticket_count = (
+            select(func.count(Ticket.id))
+            .where(Ticket.kanban_status_id == KanbanStatus.id)
+            .correlate(KanbanStatus)
+            .scalar_subquery()
+        )
+        return select(KanbanStatus, ticket_count).where(KanbanStatus.board_id == board_id).order_by(KanbanStatus.id)
+
+    def _view_tickets(self, board_id: int, tickets_per_column: int) -> Select:
+        # The first tickets of each column by rank, the correlated LIMIT runs once per status on its index
+        column_ticket = aliased(Ticket)
+        first_ids = (
+            select(column_ticket.id)
+            .where(column_ticket.kanban_status_id == KanbanStatus.id)
+            .order_by(column_ticket.rank, column_ticket.id)
+            .limit(tickets_per_column)
+            .correlate(KanbanStatus)
+        )
+        return (
+            select(Ticket)
+            .join(KanbanStatus, KanbanStatus.id == Ticket.kanban_status_id)
+            .where(KanbanStatus.board_id == board_id, Ticket.id.in_(first_ids))
+            .order_by(Ticket.kanban_status_id, Ticket.rank, Ticket.id)
+        )
+
+    def _assemble_view(self, board, statuses, tickets) -> dict:
+        columns = {
+            status.id: {**column_values(status), "ticket_count": ticket_count, "tickets": []}
+            for status, ticket_count in statuses
+        }
+        for ticket in tickets:
+            columns[ticket.kanban_status_id]["tickets"].append(column_values(ticket))
+        return {**column_values(board), "columns": list(columns.values())}
+
+
+# Tables served by delta sync, in the order clients should apply them
+SYNC_MODELS = (KanbanBoard, KanbanStatus, Project, Ticket)
+
+
+class DeltaStatements:
+    """Statements reading the rows and tombstones written after given change versions"""
+    def _current_versions(self) -> Select:
+        versions = TableVersion.__table__
+        tables = [model.__tablename__ for model in SYNC_MODELS]
+        return select(versions.c.table_name, versions.c.version).where(versions.c.table_name.in_(tables))
+
+    def _changed_rows(self, model, since: int, until: int) -> Select:
+        # Rows of writes not yet committed when the versions were read are left for the next sync
+        return (
+            select(*model.__table__.c)
+            .where(model.change_version > since, model.change_version <= until)
+            .order_by(model.id)
+        )
+
+    def _deleted_rows(self, model, since: int, until: int) -> Select:
+        tombstones = Tombstone.__table__
+        return (
+            select(tombstones.c.table_name.label("table"), tombstones.c.row_id.label("id"), tombstones.c.deleted_at)
+            .where(
+                tombstones.c.table_name == model.__tablename__,
+                tombstones.c.change_version > since,
+                tombstones.c.change_version <= until,
+            )
+            .order_by(tombstones.c.id)
+        )
@@ -0,0 +1,63 @@
+"""Managed indexes of the ORM models and a query plan check for the hot list queries.
+
+Run ``python -m app.db_models.indexes`` to create missing indexes on an existing
+database and fail (exit code 1) when a hot query still plans a full table scan.
+"""
+import sys
+from typing import List, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db_models.base import Base
+from app.db_models.async_crud import AsyncBaseCRUD, AsyncKanbanStatusCRUD, AsyncProjectCRUD, AsyncTicketCRUD
+
+
+# Query shapes issued by the list routes, as (CRUD class, filters)
+HOT_QUERIES: List[Tuple[type, dict]] = [
+    (AsyncTicketCRUD, {"project_id": 1}),
+    (AsyncTicketCRUD, {"project_id": 1, "kanban_status_id": 1}),
+    (AsyncTicketCRUD, {"kanban_status_id": 1}),
+    (AsyncTicketCRUD, {"status": "open"}),
+    (AsyncTicketCRUD, {"priority": "high"}),
+    (AsyncProjectCRUD, {"kanban_board_id": 1}),
+    (AsyncKanbanStatusCRUD, {"board_id": 1}),
+]
+
+
+def ensure_indexes(engine: Engine) -> None:
+    """Create the declared indexes missing from an existing database"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def explain(db: Session, crud: AsyncBaseCRUD, **filters) -> List[str]:
+    statement = crud._filtered_select(**filters).limit(100)
+    sql = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def find_table_scans(engine: Engine) -> List[str]:
+    """Return a description of every hot query whose plan scans a whole table"""
+    scans = []
+    with Session(engine) as db:
+        for crud_class, filters in HOT_QUERIES:
+            # Only the statements of the CRUD class are used, their plans are read on a sync session
+            for detail in explain(db, crud_class(None), **filters):
+                if detail.startswith("SCAN "):
+                    scans.append(f"{crud_class.__name__} {filters}: {detail}")
+    return scans
+
+
+if __name__ == "__main__":
+    from app.db_models.session import engine
+
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+    table_scans = find_table_scans(engine)
+    for scan in table_scans:
+        logger.error(f"Table scan in hot query plan: {scan}")
+    sys.exit(1 if table_scans else 0)
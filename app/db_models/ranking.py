@@ -0,0 +1,74 @@
+"""Lexicographic ranks ordering the tickets of a kanban column.
+
+A rank is a string of base 62 digits compared as plain text, so a ticket moves by
+writing a rank between its new neighbours without touching any other row. Ranks
+never end with the lowest digit, so there is always room before any of them.
+Repeated inserts at the same spot make ranks longer; a column is rebalanced to
+short evenly spaced ranks once one gets too long.
+"""
+from typing import List, Optional
+
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def _increment(rank: str) -> str:
+    """The next rank after ``rank`` counting on its last digits, so appending to a column rarely grows ranks"""
+    if len(rank) > 1:
+        for position in range(len(rank) - 1, -1, -1):
+            digit = DIGITS.index(rank[position])
+            if digit < BASE - 1:
+                return rank[:position] + DIGITS[digit + 1]
+    return rank + DIGITS[1]
+
+
+def _midpoint(lower: str, upper: Optional[str]) -> str:
+    if upper is not None:
+        # Keep the common prefix, the lower rank is padded with the lowest digit
+        n = 0
+        while n < len(upper) and (lower[n] if n < len(lower) else DIGITS[0]) == upper[n]:
+            n += 1
+        if n > 0:
+            return upper[:n] + _midpoint(lower[n:], upper[n:])
+    lower_digit = DIGITS.index(lower[0]) if lower else 0
+    upper_digit = DIGITS.index(upper[0]) if upper is not None else BASE
+    if upper_digit - lower_digit > 1:
+        return DIGITS[(lower_digit + upper_digit + 1) // 2]
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return DIGITS[lower_digit] + _midpoint(lower[1:], None)
+
+
+def rank_between(lower: Optional[str], upper: Optional[str]) -> str:
+    """A rank sorting after ``lower`` and before ``upper``, None meaning the start or the end of the column"""
+    if upper is not None and (not upper or (lower or "") >= upper):
+        raise ValueError(f"No rank between {lower!r} and {upper!r}")
+    if upper is None and lower:
+        return _increment(lower)
+    return _midpoint(lower or "", upper)
+
+
+def _encode(value: int, width: int) -> str:
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return "".join(reversed(digits)).rstrip(DIGITS[0])
+
+
+def spaced_ranks(count: int) -> List[str]:
+    """``count`` increasing ranks spread evenly over the lower half of the key space.
+
+    Neighbours are about ``BASE`` apart, and the upper half is left for appending.
+    """
+    width = 1
+    while BASE ** width // 2 < (count + 1) * BASE:
+        width += 1
+    span = BASE ** width // 2
+    return [_encode((n + 1) * span // (count + 1), width) for n in range(count)]
+
+
+def id_rank(id: int, width: int = 6) -> str:
+    """Rank keeping rows in id order, for rows written without a position such as seeded tickets"""
+    return _encode(id, width)
@@ -0,0 +1,113 @@
+"""Fingerprints of the applied schema and seed data, so startup only runs DDL when they changed.
+
+``schema_versions`` holds one row per applied component (the schema, the default
+rows) with a hash of what was applied. A matching fingerprint lets startup skip
+``create_all`` and the other DDL with a single primary key lookup.
+"""
+import hashlib
+from typing import Iterable, Optional
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db_models.base import Base, SchemaVersion
+from app.db_models.search import FTS_DDL
+
+
+SCHEMA = "schema"
+DEFAULTS = "defaults"
+
+
+def fingerprint(parts: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def schema_fingerprint(engine: Engine) -> str:
+    """Hash of the DDL of every table, index and search trigger for the engine's dialect"""
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            ddl.append(str(CreateIndex(index).compile(dialect=engine.dialect)))
+    if engine.dialect.name == "sqlite":
+        ddl.extend(FTS_DDL)
+    return fingerprint(ddl)
+
+
+def ensure_columns(engine: Engine) -> None:
+    """Add the declared columns missing from the tables of an existing database, new columns need a server default"""
+    inspector = inspect(engine)
+    compiler = engine.dialect.ddl_compiler(engine.dialect, None)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    spec = compiler.get_column_specification(column)
+                    conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}"))
+
+
+def ensure_autoincrement(engine: Engine) -> None:
+    """Rebuild the SQLite tables declared with ``sqlite_autoincrement`` that were created without it.
+
+    The rows are copied to a new table created from the model with its indexes, the
+    search triggers of the old table are dropped with it and recreated by
+    ``ensure_search_index``. The sequence starts after the largest id of the table
+    and of the tables listed in its ``id_tables`` info, which hold ids it handed out.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    preparer = engine.dialect.identifier_preparer
+    with engine.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"]:
+                continue
+            ddl = conn.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name})
+            if ddl is None or "AUTOINCREMENT" in ddl.upper():
+                continue
+            name, old = preparer.format_table(table), preparer.quote(f"_{table.name}_old")
+            columns = ", ".join(preparer.quote(column.name) for column in table.columns)
+            # Keep references from other tables pointing at the table name while it is renamed
+            conn.exec_driver_sql("PRAGMA legacy_alter_table = ON")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                conn.exec_driver_sql(f"ALTER TABLE {name} RENAME TO {old}")
+                for index in table.indexes:
+                    conn.exec_driver_sql(f"DROP INDEX IF EXISTS {preparer.quote(index.name)}")
+                table.create(conn)
+                conn.exec_driver_sql(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {old}")
+                conn.exec_driver_sql(f"DROP TABLE {old}")
+                id_tables = [table.name, *table.info.get("id_tables", ())]
+                floor = max(conn.scalar(text(f"SELECT coalesce(max(id), 0) FROM {preparer.quote(id_table)}")) for id_table in id_tables)
+                conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table.name})
+                conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": table.name, "seq": floor})
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.exec_driver_sql("PRAGMA legacy_alter_table = OFF")
+
+
+def stored_fingerprint(engine: Engine, name: str) -> Optional[str]:
+    """Fingerprint recorded for ``name``, None when it was never applied or the table does not exist yet"""
+    try:
+        with engine.connect() as conn:
+            return conn.scalar(select(SchemaVersion.fingerprint).where(SchemaVersion.name == name))
+    except DBAPIError:
+        return None
+
+
+def record_fingerprint(db: Session, name: str, value: str) -> None:
+    db.merge(SchemaVersion(name=name, fingerprint=value))
+    db.commit()
@@ -0,0 +1,79 @@
+"""Full-text search over ticket titles and descriptions, backed by SQLite FTS5.
+
+``tickets_fts`` is an external content FTS5 table over ``tickets``, kept in sync
+by triggers so every write path (ORM, bulk Core statements, raw SQL) updates it.
+Run ``python -m app.db_models.search`` to rebuild the index of an existing database.
+"""
+from loguru import logger
+from sqlalchemy import Select, column, func, literal_column, select, table, text
+from sqlalchemy.engine import Engine
+
+from app.db_models.base import Ticket
+
+
+FTS_TABLE = "tickets_fts"
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(title, description, content='tickets', content_rowid='id')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF title, description ON tickets BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+tickets_fts = table(FTS_TABLE, column("rowid"))
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Create the FTS table and its triggers, indexing existing tickets when the table is new"""
+    if engine.dialect.name != "sqlite":
+        logger.warning("Ticket search requires SQLite FTS5, not creating the search index")
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        for statement in FTS_DDL:
+            conn.exec_driver_sql(statement)
+        if not exists:
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def match_expression(query: str) -> str:
+    """Quote every term of a user query so FTS5 operators in it are matched literally"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search_tickets(query: str, limit: int, offset: int = 0) -> Select:
+    """Tickets matching all terms of ``query``, best bm25 score first"""
+    score = func.bm25(literal_column(FTS_TABLE)).label("score")
+    return (
+        select(Ticket, score)
+        .join(tickets_fts, tickets_fts.c.rowid == Ticket.id)
+        .where(literal_column(FTS_TABLE).op("MATCH")(match_expression(query)))
+        .order_by(score, Ticket.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+if __name__ == "__main__":
+    from app.db_models.session import engine
+
+    ensure_search_index(engine)
+    rebuild_search_index(engine)
+    logger.info("Rebuilt the ticket search index")
@@ -0,0 +1,248 @@
+"""Deterministic synthetic datasets of boards, statuses, projects and tickets.
+
+Rows are written with chunked Core ``executemany`` inserts in large transactions,
+with the secondary indexes and the search triggers dropped while loading and
+rebuilt once at the end. The same config and seed always produce the same rows.
+Run ``python -m app.db_models.seed --help`` to seed the configured database.
+"""
+import argparse
+import datetime
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.db_models.base import Base, KanbanBoard, KanbanStatus, Project, TableVersion, Ticket
+from app.db_models.aggregates import reconcile_ticket_counts
+from app.db_models.indexes import ensure_indexes
+from app.db_models.ranking import id_rank
+from app.db_models.schema import ensure_autoincrement, ensure_columns
+from app.db_models.search import FTS_TABLE, ensure_search_index, rebuild_search_index
+
+
+DEFAULT_STATUSES: Tuple[str, ...] = ("Backlog", "To Do", "In Progress", "Done")
+
+VOCABULARY: Tuple[str, ...] = (
+    "login", "error", "page", "slow", "report", "export", "button", "crash", "search", "email", "sync",
+    "upload", "invoice", "dashboard", "timeout", "mobile", "layout", "billing", "import", "filter",
+    "permission", "notification", "cache", "profile", "settings", "chart", "api", "token", "session", "font",
+)
+
+
+@dataclass
+class SeedConfig:
+    """Shape of the generated dataset, ranges are inclusive and drawn uniformly"""
+    boards: int = 1
+    projects: int = 100
+    tickets_per_project: Tuple[int, int] = (50, 150)
+    statuses: Sequence[str] = DEFAULT_STATUSES
+    # Weight of the n-th status is 1 / n ** status_skew, 0 spreads tickets evenly over the statuses
+    status_skew: float = 1.0
+    priority_weights: Dict[str, float] = field(default_factory=lambda: {"low": 0.3, "medium": 0.5, "high": 0.2})
+    title_words: Tuple[int, int] = (3, 8)
+    description_words: Tuple[int, int] = (10, 60)
+    seed: int = 0
+    chunk_size: int = 10_000
+    transaction_rows: int = 200_000
+    start_time: datetime.datetime = datetime.datetime(2024, 1, 1)
+
+
+@dataclass
+class SeedResult:
+    boards: int = 0
+    statuses: int = 0
+    projects: int = 0
+    tickets: int = 0
+    seconds: float = 0.0
+
+
+def _next_id(conn: Connection, model) -> int:
+    """First id above every id the table handed out, deleted ones and those kept in its ``id_tables`` included"""
+    table = model.__table__
+    ids = [conn.scalar(select(func.max(table.c.id))) or 0]
+    ids.extend(conn.scalar(select(func.max(Base.metadata.tables[name].c.id))) or 0 for name in table.info.get("id_tables", ()))
+    if conn.dialect.name == "sqlite" and table.dialect_options["sqlite"]["autoincrement"]:
+        ids.append(conn.scalar(text("SELECT seq FROM sqlite_sequence WHERE name = :name"), {"name": table.name}) or 0)
+    return max(ids) + 1
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+@contextmanager
+def deferred_indexes(engine: Engine) -> Iterator[None]:
+    """Drop the secondary indexes and search triggers while loading, rebuild them afterwards"""
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+    for index in indexes:
+        index.drop(bind=engine, checkfirst=True)
+    search = engine.dialect.name == "sqlite"
+    if search:
+        with engine.begin() as conn:
+            for trigger in ("insert", "delete", "update"):
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+    try:
+        yield
+    finally:
+        ensure_indexes(engine)
+        if search:
+            ensure_search_index(engine)
+            rebuild_search_index(engine)
+
+
+class Seeder:
+    """Generates the rows of a ``SeedConfig``, ids continue after the rows already in the database"""
+    def __init__(self, config: SeedConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        weights = [1 / (n + 1) ** config.status_skew for n in range(len(config.statuses))]
+        self.status_weights = list(itertools.accumulate(weights))
+        self.priorities = list(config.priority_weights)
+        self.priority_weights = list(itertools.accumulate(config.priority_weights.values()))
+
+    def _text(self, words: Tuple[int, int]) -> str:
+        return " ".join(self.rng.choices(VOCABULARY, k=self.rng.randint(*words)))
+
+    def _timestamp(self, n: int) -> datetime.datetime:
+        return self.config.start_time + datetime.timedelta(seconds=n)
+
+    def boards(self, first_id: int) -> List[dict]:
+        return [
+            {"id": first_id + n, "name": f"Board {first_id + n}", "description": self._text(self.config.description_words),
+             "created_at": self._timestamp(first_id + n), "updated_at": self._timestamp(first_id + n)}
+            for n in range(self.config.boards)
+        ]
+
+    def statuses(self, board_ids: List[int], first_id: int) -> List[dict]:
+        rows = []
+        for board_id in board_ids:
+            for name in self.config.statuses:
+                n = len(rows)
+                rows.append({"id": first_id + n, "name": name, "description": f"{name} Status", "board_id": board_id,
+                             "created_at": self._timestamp(first_id + n), "updated_at": self._timestamp(first_id + n)})
+        return rows
+
+    def projects(self, board_ids: List[int], first_id: int) -> Iterator[dict]:
+        for n in range(self.config.projects):
+            yield {"id": first_id + n, "name": f"Project {first_id + n}", "description": self._text(self.config.description_words),
+                   "kanban_board_id": board_ids[n % len(board_ids)],
+                   "created_at": self._timestamp(first_id + n), "updated_at": self._timestamp(first_id + n)}
+
+    def tickets(self, projects: List[dict], statuses_by_board: Dict[int, List[int]], first_id: int) -> Iterator[dict]:
+        rng, config = self.rng, self.config
+        n = 0
+        for project in projects:
+            status_ids = statuses_by_board[project["kanban_board_id"]]
+            for _ in range(rng.randint(*config.tickets_per_project)):
+                position = rng.choices(range(len(status_ids)), cum_weights=self.status_weights)[0]
+                yield {
+                    "id": first_id + n,
+                    "project_id": project["id"],
+                    "title": self._text(config.title_words),
+                    "description": self._text(config.description_words),
+                    "status": "closed" if position == len(status_ids) - 1 else "open",
+                    "priority": rng.choices(self.priorities, cum_weights=self.priority_weights)[0],
+                    "kanban_status_id": status_ids[position],
+                    "rank": id_rank(first_id + n),
+                    "created_at": self._timestamp(first_id + n),
+                    "updated_at": self._timestamp(first_id + n),
+                }
+                n += 1
+
+
+def _change_versions(conn: Connection) -> Dict[str, int]:
+    """Change version of the seeded rows per table, the counters only reach it once every row is inserted"""
+    versions = TableVersion.__table__
+    tables = [model.__tablename__ for model in (KanbanBoard, KanbanStatus, Project, Ticket)]
+    current = dict(conn.execute(select(versions.c.table_name, versions.c.version).where(versions.c.table_name.in_(tables))).all())
+    missing = [table for table in tables if table not in current]
+    if missing:
+        conn.execute(insert(versions), [{"table_name": table, "version": 0} for table in missing])
+    return {table: current.get(table, 0) + 1 for table in tables}
+
+
+def _insert_chunks(engine: Engine, model, rows: Iterator[dict], config: SeedConfig, change_version: int) -> int:
+    """Insert ``rows`` in executemany chunks, committing every ``config.transaction_rows`` rows"""
+    count = 0
+    chunks_per_transaction = max(1, config.transaction_rows // config.chunk_size)
+    chunks = _chunks(rows, config.chunk_size)
+    while batch := list(itertools.islice(chunks, chunks_per_transaction)):
+        with engine.begin() as conn:
+            for chunk in batch:
+                conn.execute(insert(model).values(change_version=change_version), chunk)
+                count += len(chunk)
+    return count
+
+
+def seed(engine: Engine, config: SeedConfig) -> SeedResult:
+    """Append the dataset described by ``config`` to the database"""
+    started_at = time.perf_counter()
+    seeder = Seeder(config)
+    result = SeedResult()
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_autoincrement(engine)
+    with deferred_indexes(engine):
+        with engine.begin() as conn:
+            change_versions = _change_versions(conn)
+            boards = seeder.boards(_next_id(conn, KanbanBoard))
+            conn.execute(insert(KanbanBoard).values(change_version=change_versions[KanbanBoard.__tablename__]), boards)
+            board_ids = [board["id"] for board in boards]
+            statuses = seeder.statuses(board_ids, _next_id(conn, KanbanStatus))
+            conn.execute(insert(KanbanStatus).values(change_version=change_versions[KanbanStatus.__tablename__]), statuses)
+            first_project_id = _next_id(conn, Project)
+            first_ticket_id = _next_id(conn, Ticket)
+        statuses_by_board: Dict[int, List[int]] = {}
+        for status in statuses:
+            statuses_by_board.setdefault(status["board_id"], []).append(status["id"])
+        result.boards, result.statuses = len(boards), len(statuses)
+
+        for projects in _chunks(seeder.projects(board_ids, first_project_id), config.transaction_rows):
+            result.projects += _insert_chunks(engine, Project, iter(projects), config, change_versions[Project.__tablename__])
+            tickets = seeder.tickets(projects, statuses_by_board, first_ticket_id + result.tickets)
+            result.tickets += _insert_chunks(engine, Ticket, tickets, config, change_versions[Ticket.__tablename__])
+            logger.info(f"Seeded {result.projects} projects and {result.tickets} tickets")
+
+        with engine.begin() as conn:
+            versions = TableVersion.__table__
+            for table, version in change_versions.items():
+                conn.execute(update(versions).where(versions.c.table_name == table).values(version=version))
+        # Seeded tickets bypass the CRUD layer, count them in one pass
+        reconcile_ticket_counts(engine)
+    result.seconds = time.perf_counter() - started_at
+    return result
+
+
+if __name__ == "__main__":
+    from app.db_models.session import engine
+
+    parser = argparse.ArgumentParser(prog="python -m app.db_models.seed", description="Seed a synthetic dataset")
+    parser.add_argument("--boards", type=int, default=1)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tickets-per-project", type=int, nargs=2, default=(50, 150), metavar=("MIN", "MAX"))
+    parser.add_argument("--status-skew", type=float, default=1.0, help="0 spreads tickets evenly over the statuses")
+    parser.add_argument("--title-words", type=int, nargs=2, default=(3, 8), metavar=("MIN", "MAX"))
+    parser.add_argument("--description-words", type=int, nargs=2, default=(10, 60), metavar=("MIN", "MAX"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    result = seed(engine, SeedConfig(
+        boards=args.boards,
+        projects=args.projects,
+        tickets_per_project=tuple(args.tickets_per_project),
+        status_skew=args.status_skew,
+        title_words=tuple(args.title_words),
+        description_words=tuple(args.description_words),
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+    ))
+    logger.info(f"Seeded {result.boards} boards, {result.statuses} statuses, {result.projects} projects "
+                f"and {result.tickets} tickets in {result.seconds:.1f}s")
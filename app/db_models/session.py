@@ -1,12 +1,127 @@
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 import os
 
+from app.core.config import get_app_settings
+from app.core.metrics import instrument_engine
+from app.core.settings.app import AppSettings
+
 
 # Define the path to the database file within the app/ folder
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'project_management.db')}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Async DBAPI drivers used when the configured URL does not name one
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+    """Run the PRAGMAs on every new DBAPI connection of the engine"""
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# Execution option naming the SQLite transaction type, IMMEDIATE for transactions that will write
+SQLITE_BEGIN = "sqlite_begin"
+
+
+def use_sqlite_transactions(engine: Engine) -> None:
+    """Emit BEGIN from SQLAlchemy instead of the sqlite3 driver, so savepoints nest in the transaction.
+
+    The driver only begins a transaction before a write, and a SAVEPOINT outside of
+    one is a transaction of its own that RELEASE commits. Transactions are DEFERRED
+    unless the connection sets ``SQLITE_BEGIN``: writes start theirs IMMEDIATE, taking
+    the write lock up front, as a transaction reading before it writes could otherwise
+    fail to upgrade its lock after another writer committed.
+    """
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, _connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql(f"BEGIN {connection.get_execution_options().get(SQLITE_BEGIN, 'DEFERRED')}")
+
+
+def _is_memory(database_url: str) -> bool:
+    return ":memory:" in database_url or make_url(database_url).database in (None, "")
+
+
+def _engine_kwargs(database_url: str, settings: AppSettings) -> dict:
+    if not database_url.startswith("sqlite"):
+        return {"pool_pre_ping": True, **settings.db_pool_kwargs}
+    if _is_memory(database_url):
+        # In-memory databases live in a single connection, pool settings do not apply
+        return {"connect_args": {"check_same_thread": False}}
+    return {"connect_args": {"check_same_thread": False}, **settings.db_pool_kwargs}
+
+
+def _read_engine_options(database_url: str, settings: AppSettings) -> tuple:
+    """URL, SQLite PRAGMAs and execution options of the read-only engine"""
+    if settings.database_read_url:
+        database_url = settings.database_read_url
+    if database_url.startswith("sqlite"):
+        # Refuse writes on the connection, query_only comes last so the other PRAGMAs still apply
+        return database_url, {**settings.sqlite_pragmas, "query_only": "ON"}, {}
+    if database_url.startswith("postgresql"):
+        return database_url, None, {"postgresql_readonly": True}
+    return database_url, None, {}
+
+
+def create_db_engine(settings: AppSettings) -> Engine:
+    database_url = settings.database_url or DATABASE_URL
+    engine = create_engine(database_url, **_engine_kwargs(database_url, settings))
+    if database_url.startswith("sqlite"):
+        apply_sqlite_pragmas(engine, settings.sqlite_pragmas)
+    instrument_engine(engine)
+    return engine
+
+
+def create_async_db_engine(settings: AppSettings, read_only: bool = False) -> AsyncEngine:
+    database_url = settings.database_url or DATABASE_URL
+    pragmas, execution_options = settings.sqlite_pragmas, {}
+    if read_only:
+        database_url, pragmas, execution_options = _read_engine_options(database_url, settings)
+    database_url = to_async_url(database_url)
+    engine = create_async_engine(database_url, **_engine_kwargs(database_url, settings))
+    if database_url.startswith("sqlite"):
+        apply_sqlite_pragmas(engine.sync_engine, pragmas)
+        if not read_only:
+            # The write coalescer runs every write of a batch in a savepoint
+            use_sqlite_transactions(engine.sync_engine)
+    instrument_engine(engine.sync_engine)
+    return engine.execution_options(**execution_options) if execution_options else engine
+
+
+def _has_read_pool(settings: AppSettings) -> bool:
+    # An in-memory database only exists in its own connection, reads have to share it
+    return bool(settings.database_read_url) or not _is_memory(settings.database_url or DATABASE_URL)
+
+
+engine = create_db_engine(get_app_settings())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_db_engine(get_app_settings())
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read sessions use their own pool, on DATABASE_READ_URL (a replica) or read-only connections to the database
+async_read_engine = (
+    create_async_db_engine(get_app_settings(), read_only=True) if _has_read_pool(get_app_settings()) else async_engine
+)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
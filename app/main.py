@@ -9,6 +9,8 @@ from app.api.routes.api import router as api_router
 from app.api.routes.home import router as home_router
 from app.core.config import get_app_settings
 from app.core.events import create_start_app_handler, create_stop_app_handler
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware
 
 
 def get_application() -> FastAPI:
@@ -28,6 +30,12 @@ def get_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    if settings.metrics_enabled:
+        application.add_middleware(MetricsMiddleware)
+    
+    if settings.compression_minimum_size > 0:
+        application.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+    
     application.add_event_handler("startup", create_start_app_handler(application))
     application.add_event_handler("shutdown", create_stop_app_handler(application))
     application.add_exception_handler(HTTPException, http_error_handler)
@@ -0,0 +1 @@
+"""Load tests and micro-benchmarks of the API, see ``python -m benchmarks --help``"""
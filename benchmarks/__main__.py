@@ -0,0 +1,132 @@
+"""Benchmark the API and compare the results against a saved baseline.
+
+    python -m benchmarks run --scale 1k --mode inprocess --output benchmarks/baselines/1k-inprocess.json
+    python -m benchmarks compare benchmarks/baselines/1k-inprocess.json current.json --threshold 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+SCALES: Dict[str, int] = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.database:
+        database = Path(args.database).resolve()
+    else:
+        database = Path(tempfile.mkdtemp(prefix="benchmark-")) / f"benchmark-{args.scale}.db"
+    tickets = SCALES[args.scale]
+    tickets_per_project = 100
+    # The app reads its settings at import, point it at the benchmark database first
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["CREATE_DEFAULTS"] = "false"
+
+    from sqlalchemy import create_engine
+    from app.db_models.seed import SeedConfig, seed
+    from benchmarks.runner import in_process_client, run_scenario, uvicorn_client
+    from benchmarks.scenarios import SCENARIOS, Dataset
+
+    if not database.exists():
+        print(f"Seeding {tickets} tickets into {database}", file=sys.stderr)
+        engine = create_engine(os.environ["DATABASE_URL"])
+        seed(engine, SeedConfig(projects=tickets // tickets_per_project,
+                                tickets_per_project=(tickets_per_project, tickets_per_project), seed=args.seed))
+        engine.dispose()
+    data = Dataset(tickets=tickets, projects=tickets // tickets_per_project)
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only]
+
+    async def run_all() -> dict:
+        client_factory = in_process_client() if args.mode == "inprocess" else uvicorn_client(args.concurrency)
+        results = {}
+        async with client_factory as client:
+            for scenario in scenarios:
+                await run_scenario(client, scenario, data, args.warmup, args.concurrency, args.seed)
+                results[scenario.name] = await run_scenario(
+                    client, scenario, data, args.requests, args.concurrency, args.seed + 1
+                )
+                print(f"{scenario.name:<24} {_format(results[scenario.name])}", file=sys.stderr)
+        return results
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "mode": args.mode,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "endpoints": asyncio.run(run_all()),
+    }
+    if not args.database:
+        shutil.rmtree(database.parent, ignore_errors=True)
+    output = Path(args.output or f"benchmarks/baselines/{args.scale}-{args.mode}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Saved results to {output}", file=sys.stderr)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text())["endpoints"]
+    current = json.loads(Path(args.current).read_text())["endpoints"]
+    regressions: List[str] = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name], current[name]
+        rps_change = after["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+        p95_change = after["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        regressed = rps_change < -args.threshold or p95_change > args.threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{'REGRESSION' if regressed else 'ok':<10} {name:<24} rps {rps_change:+.1%}  p95 {p95_change:+.1%}")
+    if regressions:
+        print(f"{len(regressions)} endpoint(s) regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def _format(result: dict) -> str:
+    return (f"{result['rps']:>10.1f} req/s  p50 {result['p50_ms']:.2f}ms  p95 {result['p95_ms']:.2f}ms  "
+            f"p99 {result['p99_ms']:.2f}ms  errors {result['errors']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark every router and save the results")
+    run_parser.add_argument("--scale", choices=SCALES, default="1k", help="number of seeded tickets")
+    run_parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    run_parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    run_parser.add_argument("--warmup", type=int, default=20, help="untimed requests per endpoint")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--only", nargs="*", help="scenario names to run, e.g. tickets.get")
+    run_parser.add_argument("--database", help="SQLite file to reuse, seeded when it does not exist")
+    run_parser.add_argument("--output", help="JSON file, defaults to benchmarks/baselines/<scale>-<mode>.json")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag endpoints slower than a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="tolerated relative drop in req/s or rise in p95 latency")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Drive the scenarios with a concurrent client, in-process or over a local uvicorn"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Sequence
+
+import httpx
+
+from benchmarks.scenarios import Dataset, Scenario
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, data: Dataset, requests: int,
+                       concurrency: int, seed: int = 0) -> Dict[str, float]:
+    """Issue ``requests`` requests from ``concurrency`` workers, returns throughput and latency percentiles"""
+    rng = random.Random(seed)
+    calls = iter([
+        (scenario.path(rng, data), scenario.body(rng, data) if scenario.body else None) for _ in range(requests)
+    ])
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for path, body in calls:
+            started_at = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+@asynccontextmanager
+async def in_process_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Client calling the ASGI app directly, the settings must already point at the benchmark database"""
+    from app.main import app
+
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(concurrency: int, startup_timeout: float = 30.0) -> AsyncIterator[httpx.AsyncClient]:
+    """Client calling a uvicorn server started on a free local port with the current environment"""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                try:
+                    await client.get("/health")
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
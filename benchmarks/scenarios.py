@@ -0,0 +1,52 @@
+"""Requests issued against every router, with ids drawn from the seeded dataset"""
+import random
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from app.db_models.seed import DEFAULT_STATUSES, VOCABULARY
+
+
+@dataclass
+class Dataset:
+    tickets: int
+    projects: int
+    statuses: int = len(DEFAULT_STATUSES)
+    boards: int = 1
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[random.Random, Dataset], str]
+    body: Optional[Callable[[random.Random, Dataset], dict]] = None
+
+
+def _ticket_body(rng: random.Random, data: Dataset) -> dict:
+    return {
+        "project_id": rng.randint(1, data.projects),
+        "title": " ".join(rng.choices(VOCABULARY, k=3)),
+        "description": " ".join(rng.choices(VOCABULARY, k=20)),
+        "status": "open",
+        "priority": rng.choice(("low", "medium", "high")),
+        "kanban_status_id": rng.randint(1, data.statuses),
+    }
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("projects.list", "GET", lambda rng, data: "/api/projects/?limit=100"),
+    Scenario("projects.get", "GET", lambda rng, data: f"/api/projects/{rng.randint(1, data.projects)}"),
+    Scenario("tickets.list", "GET", lambda rng, data: "/api/tickets/?limit=100"),
+    Scenario("tickets.list_filtered", "GET",
+             lambda rng, data: f"/api/tickets/?limit=100&project_id={rng.randint(1, data.projects)}&status=open"),
+    Scenario("tickets.get", "GET", lambda rng, data: f"/api/tickets/{rng.randint(1, data.tickets)}"),
+    Scenario("tickets.search", "GET", lambda rng, data: f"/api/tickets/search?q={rng.choice(VOCABULARY)}"),
+    Scenario("tickets.create", "POST", lambda rng, data: "/api/tickets/", _ticket_body),
+    Scenario("tickets.patch", "PATCH", lambda rng, data: f"/api/tickets/{rng.randint(1, data.tickets)}",
+             lambda rng, data: {"priority": rng.choice(("low", "medium", "high"))}),
+    Scenario("kanbanboard.list", "GET", lambda rng, data: "/api/kanbanboard/"),
+    Scenario("kanbanboard.get", "GET", lambda rng, data: f"/api/kanbanboard/{rng.randint(1, data.boards)}"),
+    Scenario("kanbanboard.view", "GET", lambda rng, data: f"/api/kanbanboard/{rng.randint(1, data.boards)}/view"),
+    Scenario("kanbanstatus.list", "GET", lambda rng, data: "/api/kanbanstatus/"),
+    Scenario("kanbanstatus.get", "GET", lambda rng, data: f"/api/kanbanstatus/{rng.randint(1, data.statuses)}"),
+]
@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+import pytest
+
+# The settings and engines are built at import, point them at a scratch database first
+DATABASE_DIR = tempfile.mkdtemp(prefix="project-management-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DATABASE_DIR, 'test.db')}"
+os.environ["CREATE_DEFAULTS"] = "false"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def board(client):
+    return client.post("/api/kanbanboard/", json={"name": "Board"}).json()
+
+
+@pytest.fixture
+def statuses(client, board):
+    return [
+        client.post("/api/kanbanstatus/", json={"name": name, "board_id": board["id"]}).json()
+        for name in ("To Do", "Done")
+    ]
+
+
+@pytest.fixture
+def project(client, board):
+    return client.post("/api/projects/", json={"name": "Project", "description": "", "kanban_board_id": board["id"]}).json()
+
+
+@pytest.fixture
+def create_ticket(client, project, statuses):
+    def create(**values):
+        ticket = {
+            "project_id": project["id"],
+            "title": "Ticket",
+            "description": "Description",
+            "status": "open",
+            "priority": "medium",
+            "kanban_status_id": statuses[0]["id"],
+            **values,
+        }
+        response = client.post("/api/tickets/", json=ticket)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return create
@@ -0,0 +1,60 @@
+import asyncio
+import datetime
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import get_app_settings
+from app.db_models.archive import archive_tickets
+from app.db_models.base import Base, Ticket
+from app.db_models.schema import ensure_autoincrement
+
+
+def archive(client, ticket):
+    settings = get_app_settings().model_copy(update={"archive_after_days": 0.0})
+    client.patch(f"/api/tickets/{ticket['id']}", json={"status": "closed"})
+    asyncio.run(archive_tickets(settings))
+
+
+def test_ids_of_archived_and_deleted_tickets_are_not_reused(client, create_ticket):
+    tickets = [create_ticket() for _ in range(4)]
+    archive(client, tickets[1])
+    for ticket in tickets[2:]:
+        assert client.delete(f"/api/tickets/{ticket['id']}").status_code == 204
+    created = create_ticket()
+    assert created["id"] > tickets[-1]["id"]
+
+    restored = client.patch(f"/api/tickets/{tickets[1]['id']}", json={"status": "open"})
+    assert restored.status_code == 200
+    assert client.get(f"/api/tickets/{tickets[1]['id']}").json()["status"] == "open"
+
+
+def test_newest_ticket_can_be_archived(client, create_ticket):
+    ticket = create_ticket()
+    archive(client, ticket)
+    assert client.get(f"/api/tickets/{ticket['id']}").status_code == 404
+    assert create_ticket()["id"] > ticket["id"]
+
+
+def test_tickets_table_is_rebuilt_with_autoincrement(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE tickets")
+        conn.exec_driver_sql("CREATE TABLE tickets (id INTEGER PRIMARY KEY, project_id INTEGER, title VARCHAR(255), "
+                             "description TEXT, status VARCHAR(255), priority VARCHAR(255), created_at DATETIME, "
+                             "updated_at DATETIME, kanban_status_id INTEGER, rank VARCHAR(255) DEFAULT '', "
+                             "change_version INTEGER DEFAULT 0)")
+        conn.exec_driver_sql("INSERT INTO tickets (id, project_id, title, description, status, priority, kanban_status_id) "
+                             "VALUES (1, 1, 't', 'd', 'open', 'low', 1), (2, 1, 't', 'd', 'open', 'low', 1)")
+        conn.exec_driver_sql("INSERT INTO archived_tickets (id, project_id, title, description, status, priority, "
+                             "kanban_status_id, archived_at) VALUES (3, 1, 't', 'd', 'closed', 'low', 1, :now)",
+                             {"now": datetime.datetime.utcnow()})
+    ensure_autoincrement(engine)
+    with engine.begin() as conn:
+        assert "AUTOINCREMENT" in conn.scalar(text("SELECT sql FROM sqlite_master WHERE name = 'tickets'"))
+        assert conn.scalar(text("SELECT count(*) FROM tickets")) == 2
+        indexes = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tickets'"))}
+        assert {index.name for index in Ticket.__table__.indexes} <= indexes
+        conn.exec_driver_sql("INSERT INTO tickets (project_id, title, description, status, priority, kanban_status_id) "
+                             "VALUES (1, 't', 'd', 'open', 'low', 1)")
+        assert conn.scalar(text("SELECT max(id) FROM tickets")) == 4
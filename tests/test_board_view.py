@@ -0,0 +1,25 @@
+def test_board_view_revalidates(client, board, statuses, create_ticket):
+    url = f"/api/kanbanboard/{board['id']}/view"
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    ticket = create_ticket()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["columns"][0]["tickets"][-1]["id"] == ticket["id"]
+    etag = response.headers["etag"]
+
+    client.patch(f"/api/kanbanstatus/{statuses[1]['id']}", json={"name": "Shipped"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["columns"][1]["name"] == "Shipped"
+
+
+def test_board_view_etag_depends_on_board_and_query(client, board):
+    other = client.post("/api/kanbanboard/", json={"name": "Other"}).json()
+    etag = client.get(f"/api/kanbanboard/{board['id']}/view").headers["etag"]
+    assert client.get(f"/api/kanbanboard/{other['id']}/view", headers={"If-None-Match": etag}).status_code == 200
+    response = client.get(f"/api/kanbanboard/{board['id']}/view?tickets_per_column=5", headers={"If-None-Match": etag})
+    assert response.status_code == 200
@@ -0,0 +1,39 @@
+MISSING = 10 ** 9
+
+
+def test_bulk_create_returns_the_rows_in_input_order(client, project, statuses):
+    tickets = [
+        {"project_id": project["id"], "title": title, "description": "", "status": "open", "priority": "low",
+         "kanban_status_id": statuses[0]["id"]}
+        for title in ("First", "Second", "Third")
+    ]
+    response = client.post("/api/tickets/bulk", json=tickets)
+    assert response.status_code == 201
+    assert [ticket["title"] for ticket in response.json()] == ["First", "Second", "Third"]
+
+
+def test_bulk_update_reports_missing_ids_per_item(client, create_ticket):
+    first, second = create_ticket(), create_ticket()
+    response = client.patch("/api/tickets/bulk", json=[
+        {"id": first["id"], "title": "Updated"},
+        {"id": MISSING, "title": "Nowhere"},
+        {"id": second["id"], "priority": "high"},
+    ])
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": first["id"], "status": "updated"},
+        {"id": MISSING, "status": "not_found"},
+        {"id": second["id"], "status": "updated"},
+    ]
+    assert client.get(f"/api/tickets/{first['id']}").json()["title"] == "Updated"
+    assert client.get(f"/api/tickets/{second['id']}").json()["priority"] == "high"
+
+
+def test_bulk_delete_reports_missing_ids_per_item(client, create_ticket):
+    ticket = create_ticket()
+    response = client.request("DELETE", "/api/tickets/bulk", json={"ids": [MISSING, ticket["id"]]})
+    assert response.status_code == 200
+    assert response.json() == [{"id": MISSING, "status": "not_found"}, {"id": ticket["id"], "status": "deleted"}]
+    assert client.get(f"/api/tickets/{ticket['id']}").status_code == 404
+    response = client.request("DELETE", "/api/tickets/bulk", json={"ids": [ticket["id"]]})
+    assert response.json() == [{"id": ticket["id"], "status": "not_found"}]
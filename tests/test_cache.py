@@ -0,0 +1,52 @@
+import asyncio
+import datetime
+
+from app.db_models.async_crud import AsyncKanbanBoardCRUD
+from app.db_models.cache import EntityCache, InMemoryCacheBackend, LRUCache, entity_cache
+from app.db_models.session import AsyncReadSessionLocal
+
+
+def shared_cache():
+    return EntityCache(LRUCache(), InMemoryCacheBackend(), ["kanban_boards"])
+
+
+def test_shared_backend_round_trips_json():
+    cache = shared_cache()
+    values = {"id": 1, "name": "Board", "description": None, "created_at": datetime.datetime(2026, 1, 2, 3, 4, 5, 6)}
+    cache.set("kanban_boards", 1, values, cache.generation())
+    payload = cache.shared.get(cache.key("kanban_boards", 1))
+    assert payload.startswith(b"{")
+    cache.local.clear()
+    assert cache.get("kanban_boards", 1) == values
+
+
+def test_store_after_invalidation_is_dropped():
+    cache = shared_cache()
+    generation = cache.generation()
+    cache.invalidate("kanban_boards", [1])
+    cache.set("kanban_boards", 1, {"id": 1}, generation)
+    assert cache.get("kanban_boards", 1) is None
+
+
+def test_invalidation_from_another_worker_is_seen():
+    cache, other = shared_cache(), shared_cache()
+    other.shared = cache.shared
+    generation = cache.generation()
+    other.invalidate("kanban_boards", [1])
+    cache.set("kanban_boards", 1, {"id": 1}, generation)
+    assert cache.get("kanban_boards", 1) is None
+
+
+def test_read_racing_a_write_does_not_cache_the_old_row(client, board):
+    async def read(write=None):
+        async with AsyncReadSessionLocal() as db:
+            await db.connection()
+            if write is not None:
+                write()
+            return await AsyncKanbanBoardCRUD(db).get(board["id"])
+
+    entity_cache.invalidate("kanban_boards", [board["id"]])
+    asyncio.run(read(lambda: client.patch(f"/api/kanbanboard/{board['id']}", json={"name": "Renamed"})))
+    assert entity_cache.get("kanban_boards", board["id"]) is None
+    asyncio.run(read())
+    assert entity_cache.get("kanban_boards", board["id"])["name"] == "Renamed"
@@ -0,0 +1,56 @@
+import asyncio
+import sqlite3
+
+from app.db_models.async_crud import AsyncKanbanBoardCRUD
+from app.db_models.coalescer import WriteCoalescer
+from app.db_models.session import AsyncSessionLocal, async_engine
+
+
+class BoardProbe:
+    """Writer-side step reading the boards through a connection of its own"""
+    def __init__(self, db):
+        self.db = db
+
+    async def count(self, name: str) -> int:
+        with sqlite3.connect(async_engine.url.database) as connection:
+            return connection.execute("SELECT count(*) FROM kanban_boards WHERE name = ?", (name,)).fetchone()[0]
+
+    async def fail(self):
+        raise ValueError("write failed")
+
+
+def run_batch(*writes):
+    async def run():
+        coalescer = WriteCoalescer(AsyncSessionLocal, batch_delay=0.05)
+        try:
+            return await asyncio.gather(
+                *(coalescer.submit(crud_class, method, **kwargs) for crud_class, method, kwargs in writes),
+                return_exceptions=True,
+            )
+        finally:
+            await coalescer.close()
+    return asyncio.run(run())
+
+
+def test_released_writes_are_hidden_until_the_batch_commits(client):
+    created, failed, seen_in_batch = run_batch(
+        (AsyncKanbanBoardCRUD, "create", {"name": "Coalesced", "description": None}),
+        (BoardProbe, "fail", {}),
+        (BoardProbe, "count", {"name": "Coalesced"}),
+    )
+    assert created.name == "Coalesced"
+    assert isinstance(failed, ValueError)
+    assert seen_in_batch == 0
+    assert asyncio.run(BoardProbe(None).count("Coalesced")) == 1
+
+
+def test_write_releases_the_lock_when_it_commits(client):
+    async def create():
+        async with AsyncSessionLocal() as db:
+            board = await AsyncKanbanBoardCRUD(db).create(name="Unlocked", description=None)
+            assert not db.in_transaction()
+            with sqlite3.connect(async_engine.url.database, timeout=0) as connection:
+                connection.execute("UPDATE kanban_boards SET description = 'other writer' WHERE id = ?", (board.id,))
+            return board
+
+    assert asyncio.run(create()).name == "Unlocked"
@@ -0,0 +1,39 @@
+import sqlite3
+
+from app.db_models.session import engine
+
+
+def write_elsewhere(statement, *params):
+    """Write through a connection of its own, as another worker would, leaving this worker's cache untouched"""
+    with sqlite3.connect(engine.url.database) as connection:
+        connection.execute(statement, params)
+
+
+def test_if_match_sees_writes_of_other_workers(client, board):
+    url = f"/api/kanbanboard/{board['id']}"
+    etag = client.get(url).headers["etag"]
+    write_elsewhere("UPDATE kanban_boards SET name = 'Elsewhere', updated_at = '2099-01-01 00:00:00' WHERE id = ?", board["id"])
+
+    response = client.patch(url, json={"name": "Mine"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_match_and_if_none_match(client, board):
+    url = f"/api/kanbanboard/{board['id']}"
+    response = client.get(url)
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    updated = client.patch(url, json={"name": "Renamed"}, headers={"If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["etag"] != etag
+    assert client.delete(url, headers={"If-Match": etag}).status_code == 412
+    assert client.delete(url, headers={"If-Match": updated.headers["etag"]}).status_code == 204
+
+
+def test_get_drops_rows_cached_before_writes_of_other_workers(client, board):
+    url = f"/api/kanbanboard/{board['id']}"
+    client.get(url)
+    write_elsewhere("UPDATE kanban_boards SET name = 'Elsewhere', updated_at = '2099-01-01 00:00:00' WHERE id = ?", board["id"])
+    assert client.get(url).json()["name"] == "Elsewhere"
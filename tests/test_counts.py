@@ -0,0 +1,51 @@
+from sqlalchemy import select, update
+
+from app.db_models.aggregates import count_tickets, reconcile_ticket_counts
+from app.db_models.base import TicketCount
+from app.db_models.session import engine
+from tests.test_archive import archive
+
+
+def stored_and_actual():
+    table = TicketCount.__table__
+    with engine.connect() as conn:
+        stored = {tuple(row[:3]): row[3] for row in conn.execute(select(*table.c)) if row[3]}
+        actual = {tuple(row[:3]): row[3] for row in conn.execute(count_tickets())}
+    return stored, actual
+
+
+def assert_counts_match():
+    stored, actual = stored_and_actual()
+    assert stored == actual
+
+
+def test_counts_follow_every_ticket_write(client, statuses, create_ticket):
+    tickets = [create_ticket(), create_ticket(priority="high"), create_ticket(), create_ticket()]
+    assert_counts_match()
+    client.patch(f"/api/tickets/{tickets[0]['id']}", json={"kanban_status_id": statuses[1]["id"]})
+    assert_counts_match()
+    client.patch("/api/tickets/bulk", json=[
+        {"id": tickets[1]["id"], "priority": "low"},
+        {"id": tickets[2]["id"], "kanban_status_id": statuses[1]["id"], "priority": "high"},
+    ])
+    assert_counts_match()
+    client.delete(f"/api/tickets/{tickets[2]['id']}")
+    assert_counts_match()
+    archive(client, tickets[3])
+    assert client.get(f"/api/tickets/{tickets[3]['id']}").status_code == 404
+    assert_counts_match()
+    assert reconcile_ticket_counts(engine) == []
+
+
+def test_reconcile_repairs_drifted_counts(client, create_ticket):
+    ticket = create_ticket()
+    key = (ticket["project_id"], ticket["kanban_status_id"], ticket["priority"])
+    cell = dict(zip(("project_id", "kanban_status_id", "priority"), key))
+    with engine.begin() as conn:
+        conn.execute(update(TicketCount).filter_by(**cell).values(count=TicketCount.count + 5))
+    stored, actual = stored_and_actual()
+    assert stored[key] == actual[key] + 5
+
+    drift = reconcile_ticket_counts(engine)
+    assert [(drifted.project_id, drifted.kanban_status_id, drifted.priority, drifted.stored - drifted.actual) for drifted in drift] == [(*key, 5)]
+    assert_counts_match()
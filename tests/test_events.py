@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.api.responses import events
+from app.db_models.changes import ChangeBus
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    bus = ChangeBus(buffer_size=4, queue_size=2)
+    monkeypatch.setattr(events, "change_bus", bus)
+    return bus
+
+
+def publish(bus, board_id, count):
+    return [bus.publish(board_id, "tickets", "updated", {"id": n}).id for n in range(count)]
+
+
+def messages(board_id, last_event_id, before=None, count=1):
+    """The first ``count`` messages after the retry line, ``before`` runs once the stream is subscribed"""
+    async def read():
+        stream = events._board_events(board_id, last_event_id, keepalive=5.0)
+        try:
+            assert await anext(stream) == b"retry: 3000\n\n"
+            if before is not None:
+                before()
+            return [(await asyncio.wait_for(anext(stream), 1)).decode() for _ in range(count)]
+        finally:
+            await stream.aclose()
+    return asyncio.run(read())
+
+
+def event_ids(messages):
+    return [int(message.split("\n")[0].removeprefix("id: ")) for message in messages]
+
+
+def test_last_event_id_resumes_after_the_last_seen_event(bus):
+    seen, *missed = publish(bus, 1, 3)
+    publish(bus, 2, 1)
+    received = messages(1, seen, count=2)
+    assert event_ids(received) == missed
+    assert all("event: tickets.updated" in message for message in received)
+
+
+def test_lagging_subscriber_catches_up_from_the_buffer(bus):
+    published = []
+    received = messages(1, None, before=lambda: published.extend(publish(bus, 1, 3)), count=3)
+    assert event_ids(received) == published
+
+
+def test_reset_when_the_buffer_no_longer_holds_missed_events(bus):
+    received = messages(1, None, before=lambda: publish(bus, 1, 6))
+    assert received == [f"id: {bus.last_id}\nevent: reset\ndata: {{}}\n\n"]
+
+
+def test_unknown_board_has_no_event_stream(client):
+    assert client.get(f"/api/kanbanboard/{10 ** 9}/events").status_code == 404
@@ -0,0 +1,6 @@
+from app.db_models.indexes import find_table_scans
+from app.db_models.session import engine
+
+
+def test_hot_queries_use_indexes(client):
+    assert find_table_scans(engine) == []
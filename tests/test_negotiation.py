@@ -0,0 +1,38 @@
+def vary(response):
+    return {value.strip().lower() for value in response.headers.get("vary", "").split(",")}
+
+
+def test_list_varies_on_accept_and_encoding(client, create_ticket):
+    for _ in range(10):
+        create_ticket(description="x" * 200)
+    response = client.get("/api/tickets/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert {"accept", "accept-encoding"} <= vary(response)
+
+    not_modified = client.get("/api/tickets/", headers={"If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert "accept" in vary(not_modified)
+
+
+def test_streamed_formats_vary_on_accept(client, board):
+    response = client.get("/api/kanbanboard/", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert "accept" in vary(response)
+
+
+def test_compressed_responses_have_their_own_etag(client, create_ticket):
+    ticket = create_ticket(description="x" * 2000)
+    url = f"/api/tickets/{ticket['id']}"
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+
+    not_modified = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == compressed.headers["etag"]
+    updated = client.patch(url, json={"title": "Renamed"}, headers={"If-Match": compressed.headers["etag"]})
+    assert updated.status_code == 200
+    stale = client.patch(url, json={"title": "Again"}, headers={"If-Match": compressed.headers["etag"]})
+    assert stale.status_code == 412
@@ -0,0 +1,51 @@
+import base64
+
+import pytest
+
+
+def encoded(payload: bytes) -> str:
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def walk(client, url, **params):
+    """Ids of every page of ``url``, yielding after each page so the caller can write in between"""
+    cursor = None
+    while True:
+        page = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        yield [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+def test_pages_cover_every_ticket_once(client, project, create_ticket):
+    ids = [create_ticket()["id"] for _ in range(7)]
+    pages = list(walk(client, "/api/tickets/", limit=3, project_id=project["id"]))
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [id for page in pages for id in page] == ids
+
+
+def test_inserts_between_pages_are_neither_skipped_nor_repeated(client, project, create_ticket):
+    ids = [create_ticket()["id"] for _ in range(5)]
+    seen = []
+    for page in walk(client, "/api/tickets/", limit=2, project_id=project["id"]):
+        seen.extend(page)
+        if len(ids) < 8:
+            ids.append(create_ticket()["id"])
+    assert seen == ids
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encoded(b"not json"),
+    encoded(b"\xff\xfe"),
+    encoded(b"[1]"),
+    encoded(b"7"),
+    encoded(b'{"after": 1}'),
+    encoded(b'{"id": null}'),
+    encoded(b'{"id": "one"}'),
+])
+def test_malformed_cursors_are_rejected(client, cursor):
+    response = client.get("/api/tickets/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"errors": ["Invalid pagination cursor"]}
@@ -0,0 +1,65 @@
+import random
+
+from app.core.config import get_app_settings
+from app.db_models.ranking import rank_between, spaced_ranks
+
+
+def column(client, kanban_status_id):
+    tickets = client.get("/api/tickets/", params={"kanban_status_id": kanban_status_id, "limit": 100}).json()["items"]
+    return [ticket["id"] for ticket in sorted(tickets, key=lambda ticket: (ticket["rank"], ticket["id"]))]
+
+
+def test_status_change_puts_the_ticket_last_in_its_new_column(client, statuses, create_ticket):
+    to_do, done = (status["id"] for status in statuses)
+    first, second = create_ticket(), create_ticket()
+    waiting = create_ticket(kanban_status_id=done)
+    patched = client.patch(f"/api/tickets/{first['id']}", json={"kanban_status_id": done}).json()
+    assert patched["rank"] > waiting["rank"]
+    client.patch("/api/tickets/bulk", json=[{"id": second["id"], "kanban_status_id": done}])
+    assert column(client, done) == [waiting["id"], first["id"], second["id"]]
+    assert client.patch(f"/api/tickets/{first['id']}", json={"title": "Renamed"}).json()["rank"] == patched["rank"]
+
+
+def test_rank_between_orders_between_any_two_ranks():
+    generator = random.Random(0)
+    ranks = spaced_ranks(5)
+    for _ in range(500):
+        position = generator.randrange(len(ranks) - 1)
+        lower, upper = ranks[position], ranks[position + 1]
+        rank = rank_between(lower, upper)
+        assert lower < rank < upper
+        ranks.insert(position + 1, rank)
+    assert ranks[-1] < rank_between(ranks[-1], None) and rank_between(None, ranks[0]) < ranks[0]
+
+
+def test_repeated_front_and_back_inserts_keep_their_order():
+    ranks = [rank_between(None, None)]
+    for _ in range(200):
+        ranks.insert(0, rank_between(None, ranks[0]))
+        ranks.append(rank_between(ranks[-1], None))
+    assert ranks == sorted(ranks) and len(set(ranks)) == len(ranks)
+
+
+def test_move_across_columns(client, statuses, create_ticket):
+    to_do, done = (status["id"] for status in statuses)
+    moving = create_ticket()
+    first, last = create_ticket(kanban_status_id=done), create_ticket(kanban_status_id=done)
+    move = {"kanban_status_id": done, "after_id": first["id"], "before_id": last["id"]}
+    assert client.post(f"/api/tickets/{moving['id']}/move", json=move).status_code == 200
+    assert column(client, done) == [first["id"], moving["id"], last["id"]]
+    assert moving["id"] not in column(client, to_do)
+    move = {"kanban_status_id": to_do, "after_id": first["id"]}
+    assert client.post(f"/api/tickets/{moving['id']}/move", json=move).status_code == 422
+
+
+def test_long_ranks_rebalance_the_column(client, statuses, create_ticket):
+    tickets = [create_ticket()["id"] for _ in range(3)]
+    # Moving the last ticket right after the first one, over and over, halves the gap each time
+    for _ in range(get_app_settings().rank_rebalance_length * 10):
+        moving, anchor = tickets[-1], tickets[0]
+        move = {"kanban_status_id": statuses[0]["id"], "after_id": anchor, "before_id": tickets[1]}
+        assert client.post(f"/api/tickets/{moving}/move", json=move).status_code == 200
+        tickets = [anchor, moving, *tickets[1:-1]]
+    ranks = [client.get(f"/api/tickets/{id}").json()["rank"] for id in tickets]
+    assert column(client, statuses[0]["id"]) == tickets
+    assert max(map(len, ranks)) <= get_app_settings().rank_rebalance_length
@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+
+from app.db_models.base import KanbanBoard
+from app.db_models.session import AsyncReadSessionLocal, async_engine, async_read_engine
+
+
+def test_read_engine_has_its_own_pool(client):
+    assert async_read_engine is not async_engine
+
+
+def test_read_sessions_refuse_writes(client, board):
+    async def write():
+        async with AsyncReadSessionLocal() as db:
+            assert await db.scalar(select(func.count()).select_from(KanbanBoard)) >= 1
+            await db.execute(text("UPDATE kanban_boards SET name = 'Read only' WHERE id = :id"), {"id": board["id"]})
+    with pytest.raises(OperationalError, match="readonly"):
+        asyncio.run(write())
+    assert client.get(f"/api/kanbanboard/{board['id']}").json()["name"] == board["name"]
@@ -0,0 +1,9 @@
+def test_search_keeps_kanban_rank(client, create_ticket):
+    ticket = create_ticket(title="Flaky printer spooler")
+    response = client.get("/api/tickets/search", params={"q": "spooler"})
+    assert response.status_code == 200
+    [result] = response.json()
+    assert result["id"] == ticket["id"]
+    assert result["rank"] == ticket["rank"]
+    assert isinstance(result["rank"], str)
+    assert isinstance(result["score"], float)
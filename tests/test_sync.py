@@ -0,0 +1,44 @@
+from tests.test_archive import archive
+
+
+def sync(client, token=None):
+    response = client.get("/api/sync", params={"since": token} if token else {})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def changed(changes):
+    return {ticket["id"]: ticket for ticket in changes["tickets"]}
+
+
+def deleted(changes):
+    return {row["id"] for row in changes["deleted"] if row["table"] == "tickets"}
+
+
+def test_changes_since_a_token(client, create_ticket):
+    kept, removed, archived = create_ticket(), create_ticket(), create_ticket()
+    token = sync(client)["token"]
+    assert sync(client, token)["tickets"] == [] and sync(client, token)["deleted"] == []
+
+    created = create_ticket()
+    client.patch(f"/api/tickets/{kept['id']}", json={"title": "Renamed"})
+    client.delete(f"/api/tickets/{removed['id']}")
+    archive(client, archived)
+    changes = sync(client, token)
+    assert changed(changes).keys() == {created["id"], kept["id"]}
+    assert changed(changes)[kept["id"]]["title"] == "Renamed"
+    assert {removed["id"], archived["id"]} <= deleted(changes)
+
+    token = changes["token"]
+    client.patch(f"/api/tickets/{archived['id']}", json={"status": "open"})
+    changes = sync(client, token)
+    assert changed(changes).keys() == {archived["id"]}
+    assert changed(changes)[archived["id"]]["status"] == "open"
+    assert changes["deleted"] == []
+    # "e30" is the token of {}: every tombstone since the first version
+    assert removed["id"] in deleted(sync(client, "e30"))
+    assert archived["id"] not in deleted(sync(client, "e30"))
+
+
+def test_malformed_token_is_rejected(client):
+    assert client.get("/api/sync", params={"since": "not a token"}).status_code == 400
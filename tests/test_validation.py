@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.mark.parametrize("field", ["title", "status", "kanban_status_id"])
+def test_patch_ticket_rejects_null(client, create_ticket, field):
+    ticket = create_ticket()
+    response = client.patch(f"/api/tickets/{ticket['id']}", json={field: None})
+    assert response.status_code == 422
+    assert client.get(f"/api/tickets/{ticket['id']}").json()[field] == ticket[field]
+
+
+def test_patch_ticket_accepts_omitted_fields(client, create_ticket):
+    ticket = create_ticket()
+    response = client.patch(f"/api/tickets/{ticket['id']}", json={"title": "Renamed"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert response.json()["status"] == ticket["status"]
+
+
+def test_patch_kanban_board_allows_null_description(client, board):
+    assert client.patch(f"/api/kanbanboard/{board['id']}", json={"name": None}).status_code == 422
+    response = client.patch(f"/api/kanbanboard/{board['id']}", json={"description": None})
+    assert response.status_code == 200
+    assert response.json()["description"] is None
+
+
+def test_patch_project_rejects_null(client, project):
+    response = client.patch(f"/api/projects/{project['id']}", json={"kanban_board_id": None})
+    assert response.status_code == 422
+
+
+def test_bulk_update_tickets_rejects_null(client, create_ticket):
+    first, second = create_ticket(), create_ticket()
+    response = client.patch("/api/tickets/bulk", json=[
+        {"id": first["id"], "title": "Renamed"},
+        {"id": second["id"], "priority": None},
+    ])
+    assert response.status_code == 422
+    assert client.get(f"/api/tickets/{first['id']}").json()["title"] == first["title"]
+
+
+def test_bulk_update_kanban_statuses_rejects_null(client, statuses):
+    response = client.patch("/api/kanbanstatus/bulk", json=[{"id": statuses[0]["id"], "board_id": None}])
+    assert response.status_code == 422
+    response = client.patch("/api/kanbanstatus/bulk", json=[{"id": statuses[0]["id"], "description": None}])
+    assert response.status_code == 200
+
+
+def test_bulk_update_projects_rejects_null(client, project):
+    response = client.patch("/api/projects/bulk", json=[{"id": project["id"], "name": None}])
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("description", [{}, {"description": None}])
+def test_create_project_requires_a_description(client, board, description):
+    response = client.post("/api/projects/", json={"name": "Project", "kanban_board_id": board["id"], **description})
+    assert response.status_code == 422
+    response = client.put(f"/api/projects/{10 ** 9}", json={"name": "Project", "kanban_board_id": board["id"], **description})
+    assert response.status_code == 422